@@ -0,0 +1,25 @@
+# build_psi_cache.py
+
+import argparse
+import time
+from modules.psi.hash_cache import HashedIdCache
+from utils.constant import DEFAULT_PSI_CACHE_SIZE
+from utils.data_loader import load_user_ids
+
+def main():
+    parser = argparse.ArgumentParser(description="Prebuild the hashed-ID cache used by PSI (--psi-cache).")
+    parser.add_argument("files", nargs="+", help="CSV files with a user_id column")
+    parser.add_argument("--cache", type=str, required=True, help="Path of the cache file to create or update")
+    parser.add_argument("--max-entries", type=int, default=DEFAULT_PSI_CACHE_SIZE, help="Maximum entries kept in the cache")
+    args = parser.parse_args()
+
+    cache = HashedIdCache(args.cache, args.max_entries)
+    for filename in args.files:
+        user_ids = load_user_ids(filename)
+        start_time = time.time()
+        _, hits = cache.hash_all(user_ids)
+        print(f"🗃️ {filename}: {len(user_ids) - hits} IDs hashed, {hits} already cached ({time.time() - start_time:.2f}s)")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+# convert_to_binary.py
+
+import argparse
+import time
+from utils.data_loader import convert_csv_to_binary, load_party_binary
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert party CSV files into the memory-mapped binary format (.ppml).")
+    parser.add_argument("files", nargs="+", help="Party CSV files with a user_id column")
+    parser.add_argument("--output", type=str, default=None, help="Output path (single input file only), default to <file>.ppml")
+    args = parser.parse_args()
+
+    if args.output and len(args.files) > 1:
+        parser.error("--output can only be used with a single input file")
+
+    for filename in args.files:
+        start_time = time.time()
+        output = convert_csv_to_binary(filename, args.output)
+        elapsed_time = time.time() - start_time
+
+        # Reopen the result once to check it and show the load time
+        start_time = time.time()
+        user_ids, X_local, _, feature_names, label_name = load_party_binary(output)
+        load_time = time.time() - start_time
+        print(f"📦 {filename} -> {output}: {len(user_ids)} rows, features {feature_names}, label {label_name} "
+              f"(converted in {elapsed_time:.2f}s, opens in {load_time * 1000:.1f}ms)")
+
+if __name__ == "__main__":
+    main()
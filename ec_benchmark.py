@@ -0,0 +1,43 @@
+# ec_benchmark.py
+
+import argparse
+import secrets
+import time
+from modules.psi import p256
+from modules.psi.ecc import curve, hash_to_point
+
+def time_per_op(fn, args):
+    start = time.perf_counter()
+    for a in args:
+        fn(a)
+    return (time.perf_counter() - start) / len(args)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the native secp256r1 arithmetic against tinyec.")
+    parser.add_argument("--ops", type=int, default=200, help="Scalar multiplications per measurement")
+    args = parser.parse_args()
+
+    scalars = [secrets.randbelow(p256.N - 1) + 1 for _ in range(args.ops)]
+    point = hash_to_point("benchmark")
+    affine = (point.x, point.y)
+
+    # Sanity check: both backends must agree before timing them
+    for k in scalars[:5]:
+        expected = k * point
+        assert p256.scalar_mult(k, affine) == (expected.x, expected.y)
+        expected = k * curve.g
+        assert p256.base_mult(k) == (expected.x, expected.y)
+
+    results = [
+        ("k · P (variable base)", time_per_op(lambda k: k * point, scalars), time_per_op(lambda k: p256.scalar_mult(k, affine), scalars)),
+        ("k · G (fixed base)", time_per_op(lambda k: k * curve.g, scalars), time_per_op(p256.base_mult, scalars)),
+    ]
+
+    print(f"\n⏱️ secp256r1 scalar multiplication, {args.ops} ops each")
+    print(f"{'operation':<24}| {'tinyec':>10} | {'native':>10} | speedup")
+    print("-" * 60)
+    for name, tinyec_time, native_time in results:
+        print(f"{name:<24}| {tinyec_time * 1e3:>7.2f} ms | {native_time * 1e3:>7.2f} ms | {tinyec_time / native_time:5.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -2,31 +2,113 @@
 
 import sys
 import time
+import numpy as np
 from mpyc.runtime import mpc
 from modules.mpc.linear import SecureLinearRegression
 from modules.mpc.logistic import SecureLogisticRegression
-from modules.psi.multiparty_psi import run_n_party_psi
+from modules.psi.cardinality import estimate_intersection_size
+from modules.psi.distributed_psi import run_distributed_psi
+from modules.psi.hash_cache import HashedIdCache
+from modules.psi.incremental_psi import run_incremental_psi
+from modules.psi.multiparty_psi import run_n_party_psi, run_sharded_psi
 from modules.psi.party import Party
 from utils.cli_parser import parse_cli_args
-from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR
-from utils.data_loader import load_party_data_adapted
-from utils.data_normalizer import normalize_features
-from utils.visualization import plot_actual_vs_predicted, plot_logistic_evaluation_report
+from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR, DEFAULT_NEWTON_ITERATIONS
+from utils.data_joiner import intersection_indices, join_columns
+from utils.data_loader import filter_party_file, load_party_columns, scan_party_file
+from utils.data_normalizer import NORMALIZERS, fit_or_load_normalizer
+from utils.visualization import report_classification_metrics, report_regression_metrics
 
 async def main():    
     args = parse_cli_args(type="main")
     csv_file = args["csv_file"]
     normalizer_type = args["normalizer_type"]
+    normalizer_stats = args["normalizer_stats"] and args["normalizer_stats"].format(pid=mpc.pid)
+    normalizer_scope = args["normalizer_scope"]
+    engine = args["engine"]
+    batch_size = args["batch_size"]
+    log_every = args["log_every"]
+    loss_sample = args["loss_sample"]
+    tol = args["tol"]
+    check_every = args["check_every"]
+    sigmoid = args["sigmoid"]
+    sigmoid_degree = args["sigmoid_degree"]
+    sigmoid_interval = args["sigmoid_interval"]
+    optimizer = args["optimizer"]
     regression_type = args["regression_type"]
+    psi_mode = args["psi_mode"]
+    psi_workers = args["psi_workers"]
+    psi_cache = args["psi_cache"]
+    psi_cache_size = args["psi_cache_size"]
+    psi_state = args["psi_state"]
+    psi_shards = args["psi_shards"]
+    psi_estimate = args["psi_estimate"]
+    psi_min_overlap = args["psi_min_overlap"]
+    chunk_rows = args["chunk_rows"]
 
     party_id = mpc.pid
-    user_ids, X_local, y_local, feature_names, label_name = load_party_data_adapted(csv_file)
 
-    # Normalize features
-    if normalizer_type:
+    # Sharding splits the 'central' PSI only, the ring modes already keep one local set per party
+    if psi_shards > 1 and psi_mode != "central":
+        print(f"[Party {party_id}] ❌ --psi-shards requires the 'central' PSI mode, got '{psi_mode}'")
+        sys.exit(1)
+
+    # The overlap threshold is checked against the estimate, so it needs one
+    if psi_min_overlap and not psi_estimate:
+        print(f"[Party {party_id}] ❌ --psi-min-overlap requires --psi-estimate")
+        sys.exit(1)
+
+    # Build the model now so invalid training options fail before PSI and the join;
+    # epochs and learning rate are set once party 0 has entered them
+    if regression_type not in ("linear", "logistic"):
+        print(f"[Party {party_id}] ❌ Unsupported regression type: {regression_type}")
+        sys.exit(1)
+    try:
+        if regression_type == 'logistic':
+            model = SecureLogisticRegression(
+                engine=engine, optimizer=optimizer, batch_size=batch_size,
+                log_every=log_every, loss_sample=loss_sample, tol=tol, check_every=check_every,
+                sigmoid=sigmoid, sigmoid_degree=sigmoid_degree, sigmoid_interval=sigmoid_interval
+            )
+        else:
+            model = SecureLinearRegression(
+                engine=engine, batch_size=batch_size,
+                log_every=log_every, loss_sample=loss_sample, tol=tol, check_every=check_every
+            )
+    except ValueError as e:
+        print(f"[Party {party_id}] ❌ Invalid training options: {e}")
+        sys.exit(1)
+
+    try:
+        if chunk_rows:
+            # Streaming: one pass for the IDs and normalization statistics, the rows
+            # themselves are read again after PSI and only for the intersection
+            user_ids, feature_stats, feature_names, label_name = scan_party_file(csv_file, chunk_rows)
+            print(f"[Loader] 🌊 Scanned {len(user_ids)} rows in chunks of {chunk_rows}.")
+        else:
+            id_column, X_local, y_local, feature_names, label_name = load_party_columns(csv_file)
+            user_ids = id_column.tolist()  # PSI works on Python strings
+    except ValueError as e:
+        print(f"[Loader] ❌ {e}")
+        sys.exit(1)
+
+    # Normalize features (streaming mode normalizes the filtered rows with the full-file statistics,
+    # the 'joint' scope waits for the intersection and fits on its rows only)
+    if normalizer_scope not in ("joint", "local"):
+        print(f"[Normalizer] ❌ Unsupported normalizer scope: {normalizer_scope}")
+        sys.exit(1)
+    if normalizer_type and normalizer_scope == "joint":
+        if normalizer_type not in NORMALIZERS:
+            print(f"[Normalizer] ❌ Normalization error: Unsupported normalization method: {normalizer_type}")
+            sys.exit(1)
+    elif normalizer_type:
         try:
-            X_local = normalize_features(X_local, method=normalizer_type)
-            print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization.")
+            if chunk_rows:
+                normalizer = fit_or_load_normalizer(normalizer_type, normalizer_stats, stats=feature_stats)
+            else:
+                normalizer = fit_or_load_normalizer(normalizer_type, normalizer_stats, X_local)
+                X_local = normalizer.transform(X_local)
+                print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization.")
         except ValueError as e:
             print(f"[Normalizer] ❌ Normalization error: {e}")
             sys.exit(1)
@@ -36,9 +118,9 @@ async def main():
     # Start MPC runtime
     await mpc.start()
 
-    if y_local is None and party_id == 0:
+    if label_name is None and party_id == 0:
         print(f"[Party {party_id}] ❗ Warning: Expected label missing for Org A")
-    elif y_local is not None and party_id != 0:
+    elif label_name is not None and party_id != 0:
         print(f"[Party {party_id}] ❗ Warning: Label provided but will be ignored")
         
     # Send your local feature names to all other parties
@@ -53,57 +135,100 @@ async def main():
     for f_list in feature_names_all:
         joined_feature_names.extend(f_list)
 
-    # Step 1: Private Set Intersection (PSI) - Find common user IDs across all parties
-    # Step 1.1: Collect user ID lists from all parties
-    gathered_user_ids = await mpc.transfer(user_ids, senders=range(len(mpc.parties)))
-    print(f"[Party {mpc.pid}] ✅ Received user ID lists from all parties.")
+    # Step 0: Optional cardinality pre-check on a small blinded sample of the IDs
+    cache = HashedIdCache(psi_cache, psi_cache_size) if psi_cache else None
+    if psi_estimate:
+        start_time = time.time()
+        cardinality = await estimate_intersection_size(user_ids, psi_estimate, psi_workers, cache)
+        elapsed_time = time.time() - start_time
+        print(f"[Party {party_id}] 📏 Estimated intersection in {elapsed_time:.2f}s: ~{cardinality['estimate']:.0f} "
+              f"± {cardinality['stderr']:.0f} users ({cardinality['rate']:.1%} sample, set sizes {cardinality['sizes']})")
 
-    # Step 1.2: Create Party instances for each list of user IDs
-    parties = [Party(party_id, ids) for party_id, ids in enumerate(gathered_user_ids)]
+        # Every party sees the same estimate, so they all stop together
+        if psi_min_overlap and cardinality["estimate"] < psi_min_overlap:
+            print(f"[Party {party_id}] ⛔ Expected overlap is below {psi_min_overlap} users, skipping the full PSI.")
+            if cache is not None:
+                cache.close()
+            await mpc.shutdown()
+            return
 
-    # Step 1.3: Run PSI to find the shared user IDs
-    print(f"[Party {party_id}] 🔎 Computing intersection of user IDs...")
+    # Step 1: Private Set Intersection (PSI) - Find common user IDs across all parties
+    print(f"[Party {party_id}] 🔎 Computing intersection of user IDs ({psi_mode} PSI)...")
     start_time = time.time()
-    intersection = run_n_party_psi(parties)
+    if psi_mode == "distributed":
+        # Each party keeps its own key and IDs, encrypted sets circulate around a ring
+        intersection = await run_distributed_psi(user_ids, psi_workers, cache)
+    elif psi_mode == "incremental":
+        # Same ring, but only the IDs changed since the previous run are exchanged
+        intersection = await run_incremental_psi(user_ids, psi_state.format(pid=party_id), psi_workers, cache)
+    elif psi_mode == "central":
+        # Step 1.1: Collect user ID lists from all parties
+        gathered_user_ids = await mpc.transfer(user_ids, senders=range(len(mpc.parties)))
+        print(f"[Party {mpc.pid}] ✅ Received user ID lists from all parties.")
+
+        if psi_shards > 1:
+            # Step 1.2: Run PSI bucket by bucket, creating Party instances per shard
+            intersection = run_sharded_psi(gathered_user_ids, psi_shards, psi_workers, cache)
+        else:
+            # Step 1.2: Create Party instances for each list of user IDs
+            parties = [Party(party_id, ids, psi_workers, cache) for party_id, ids in enumerate(gathered_user_ids)]
+
+            # Step 1.3: Run PSI to find the shared user IDs
+            intersection = run_n_party_psi(parties)
+    else:
+        print(f"[Party {party_id}] ❌ Unsupported PSI mode: {psi_mode}")
+        sys.exit(1)
+    if cache is not None:
+        cache.close()
     elapsed_time = time.time() - start_time
     print(f"[Party {party_id}] 🔗 Found intersected user IDs in {elapsed_time:.2f}s: {intersection}")
     
     # Step 2: Join attributes for intersecting users only
     print(f"\n[Party {party_id}] 🧩 Filtering data for intersected user IDs...")
 
-    # Step 2.1: Create a mapping from user_id to index for filtering
-    id_to_index = {uid: idx for idx, uid in enumerate(user_ids)}
-    intersecting_indices = [id_to_index[uid] for uid in intersection if uid in id_to_index]
+    if chunk_rows:
+        # Step 2.1 + 2.2: Stream the file again, keeping only the intersected rows
+        X_filtered, y_filtered = filter_party_file(csv_file, intersection, chunk_rows)
+        if normalizer_type and normalizer_scope == "local":
+            X_filtered = normalizer.transform(X_filtered)
+            print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization with full-file statistics.")
+    else:
+        # Step 2.1: Locate the intersected rows in the local file, in intersection order
+        intersecting_indices = intersection_indices(id_column, intersection)
 
-    # Step 2.2: Filter local features and labels (if any)
-    X_filtered = [X_local[i] for i in intersecting_indices]
-    y_filtered = [y_local[i] for i in intersecting_indices] if y_local is not None else None
+        # Step 2.2: Filter local features and labels (if any) with one gather each
+        X_filtered = X_local[intersecting_indices]
+        y_filtered = y_local[intersecting_indices] if y_local is not None else None
 
     print(f"[Party {party_id}] 📦 Filtered {len(X_filtered)} records.")
 
-    # Step 2.3: Transfer X and y across all parties
+    if normalizer_type and normalizer_scope == "joint":
+        # Step 2.3: Fit the normalizer on the intersected rows only; each party holds
+        # exactly those rows of its own columns, so no secure computation is needed
+        try:
+            normalizer = fit_or_load_normalizer(normalizer_type, normalizer_stats, X_filtered)
+        except ValueError as e:
+            print(f"[Normalizer] ❌ Normalization error: {e}")
+            sys.exit(1)
+        X_filtered = normalizer.transform(X_filtered)
+        print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization with statistics of the intersected rows.")
+
+    # Step 2.4: Transfer the column blocks and y across all parties
     X_joined = await mpc.transfer(X_filtered, senders=range(len(mpc.parties)))
     y_final = await mpc.transfer(y_filtered, senders=[0])
 
-    # Step 2.4: Flatten and consolidate feature vectors
-    X_all = []
-    y_all = []
-
-    for i in range(len(intersection)):
-        features = []
-        for party_features in X_joined:
-            features.extend(party_features[i])
-        X_all.append(features)
-        y_all.append(y_final[0][i])
+    # Step 2.5: Assemble the feature matrix in one allocation; the logistic model fits its own bias
+    X_all = join_columns(X_joined, add_bias=regression_type != "logistic")
+    y_all = np.asarray(y_final[0], dtype=np.float64)
 
     print(f"[Party {party_id}] ✅ Completed data join.")
     
-    # [Bonus] Step 2.5: Pretty print the final joined data    
+    # [Bonus] Step 2.6: Pretty print the final joined data    
     print(f"\n[Party {party_id}] 🧾 Final joined dataset (features + label):")
 
     # Combine features and label to determine column widths
     all_rows = []
-    for features, label in zip(X_all, y_all):
+    for features, label in zip(X_all[:, :len(joined_feature_names)], y_all):
         row = list(map(str, features)) + [str(round(label, 2))]
         all_rows.append(row)
 
@@ -136,20 +261,18 @@ async def main():
         print(str(idx).ljust(5) + "| " + row_str)
 
     # At this point:
-    # X_all = [ [age, income, purchase_history, web_visits], ... ] for intersecting users
+    # X_all = [ [age, income, purchase_history, web_visits(, 1.0 for linear)], ... ] for intersecting users
     # y_all = [ purchase_amount, ... ] only from Org A
 
     # Step 3: Do regression
-    # Step 3.1: Add bias coeff to X
-    X_all = [row + [1.0] for row in X_all]
-    
-    # Step 3.2: Get the learning variables (epochs and lr)
+    # Step 3.1: Get the learning variables (epochs and lr)
+    default_epochs = DEFAULT_NEWTON_ITERATIONS if regression_type == "logistic" and optimizer != "gd" else DEFAULT_EPOCHS
     if mpc.pid == 0:
         try:
-            epochs_input = input(f"\n[Party 0] ❓ Enter number of epochs (default={DEFAULT_EPOCHS}): \n >>  ").strip()
+            epochs_input = input(f"\n[Party 0] ❓ Enter number of epochs (default={default_epochs}): \n >>  ").strip()
             lr_input = input(f"[Party 0] ❓ Enter learning rate (default={DEFAULT_LR}): \n >>  ").strip()
 
-            epochs = int(epochs_input) if epochs_input else DEFAULT_EPOCHS
+            epochs = int(epochs_input) if epochs_input else default_epochs
             lr = float(lr_input) if lr_input else DEFAULT_LR
 
             print(f"[Party 0] ✅ Using {epochs} epochs and {lr} learning rate.")
@@ -170,20 +293,17 @@ async def main():
     
     # Step 3.2: Run the regression
     print(f"\n[Party {party_id}] ⚙️ Running {regression_type} regression on the data...")    
-    if regression_type == 'logistic':
-        model = SecureLogisticRegression(epochs=epochs, lr=lr)
-    else:
-        model = SecureLinearRegression(epochs=epochs, lr=lr)
+    model.epochs, model.lr = epochs, lr
     
     await model.fit([X_all], [y_all])
 
     # Step 4: Evaluation
-    # predict the train data
-    predictions = await model.predict([X_all][0])
+    # Score the train data inside MPC, only the aggregate metrics are revealed
+    metrics = await model.evaluate(X_all, y_all)
     if regression_type == 'logistic':
-        await plot_logistic_evaluation_report(y_all, predictions, mpc)
+        await report_classification_metrics(metrics, mpc)
     else:
-        await plot_actual_vs_predicted(y_all, predictions, mpc)
+        await report_regression_metrics(metrics, mpc)
 
     await mpc.shutdown()
 
@@ -0,0 +1,41 @@
+# modules/mpc/convergence.py
+
+from mpyc.runtime import mpc
+from modules.mpc.secure_array import wide_type
+from utils.constant import DEFAULT_CHECK_EVERY
+
+class EarlyStopping:
+    """Secure convergence test that reveals a single bit per check.
+
+    Every few epochs the squared gradient norm is compared against tol² inside
+    MPC and only the outcome "converged or not" is opened to all parties.
+    """
+
+    def __init__(self, tol=None, check_every=DEFAULT_CHECK_EVERY):
+        self.tol = tol  # None disables early stopping
+        self.check_every = check_every
+        self.secnorm = wide_type()  # Squares of large gradients fit, and tol² stays above its resolution
+
+    def should_check(self, epoch):
+        return bool(self.tol) and (epoch + 1) % self.check_every == 0
+
+    async def converged(self, *gradients):
+        """Return True if the gradient norm is below tol.
+
+        Args:
+            *gradients: Secure arrays, lists of secfx values or single secfx values
+                that together form the gradient.
+        """
+        values = []
+        for g in gradients:
+            if isinstance(g, list):
+                values.extend(g)
+            elif hasattr(g, "shape"):
+                values.extend(mpc.np_tolist(mpc.np_reshape(g, (-1,))))
+            else:
+                values.append(g)
+
+        # Square in the wide type without scaling, so large gradients cannot overflow
+        wide = mpc.convert(values, self.secnorm)
+        norm_sq = mpc.in_prod(wide, wide)
+        return bool(await mpc.output(norm_sq < self.tol ** 2))
@@ -0,0 +1,35 @@
+# modules/mpc/linalg.py
+
+import numpy as np
+from mpyc.runtime import mpc
+
+def solve_spd(A, B):
+    """Securely solve A @ X = B for a symmetric positive definite matrix A.
+
+    Gauss-Jordan elimination without pivoting, which is stable for SPD matrices.
+    Each of the d steps costs one secure reciprocal and one outer-product update.
+
+    Args:
+        A (secfx.array): Secure (d, d) symmetric positive definite matrix.
+        B (secfx.array): Secure (d,) vector or (d, k) matrix of right-hand sides.
+
+    Returns:
+        secfx.array: Secure solution X with the same shape as B.
+    """
+    d = A.shape[0]
+    rhs = B if len(B.shape) == 2 else mpc.np_reshape(B, (d, 1))
+    M = mpc.np_hstack((A, rhs))
+
+    for k in range(d):
+        # Normalize the pivot row, then eliminate column k from every other row
+        pivot_row = M[k] * (1 / M[k, k])
+        M = M - mpc.np_outer(M[:, k], pivot_row)
+        M = mpc.np_update(M, k, pivot_row)
+
+    X = M[:, d:]
+    return X if len(B.shape) == 2 else mpc.np_reshape(X, (d,))
+
+def inverse_spd(A):
+    """Securely invert a symmetric positive definite matrix A."""
+    d = A.shape[0]
+    return solve_spd(A, type(A)(np.eye(d)))
@@ -1,12 +1,32 @@
 # modules/mpc/linear.py
 
+import numpy as np
 from mpyc.runtime import mpc
-from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR
+from modules.mpc.convergence import EarlyStopping
+from modules.mpc.metrics import secure_regression_metrics
+from modules.mpc.minibatch import iterate_batches, joint_rng
+from modules.mpc.secure_array import (
+    from_wide_array, is_public, to_secure_array, to_wide_array, weighted_gram, wide_factor, wide_type
+)
+from modules.mpc.telemetry import TrainingTelemetry
+from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR, DEFAULT_ENGINE, DEFAULT_LOG_EVERY, DEFAULT_CHECK_EVERY
+
+ENGINES = ("array", "gram", "scalar")
 
 class SecureLinearRegression:
-    def __init__(self, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR):
+    def __init__(self, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR, engine=DEFAULT_ENGINE, batch_size=None,
+                 log_every=DEFAULT_LOG_EVERY, loss_sample=None, tol=None, check_every=DEFAULT_CHECK_EVERY):
+        if engine not in ENGINES:
+            raise ValueError(f"Unsupported training engine: {engine}")
+        if batch_size and engine != "array":
+            raise ValueError("Mini-batch training requires the 'array' engine")
+
         self.epochs = epochs
         self.lr = lr
+        self.engine = engine
+        self.batch_size = batch_size  # None means full-batch gradient descent
+        self.telemetry = TrainingTelemetry(log_every, loss_sample)  # loss_sample also logs the MSE on that many rows
+        self.early_stopping = EarlyStopping(tol, check_every)  # Stop once the gradient norm drops below tol
         self.theta = None  # Model parameters
         self.secfx = mpc.SecFxp()
 
@@ -17,7 +37,7 @@ class SecureLinearRegression:
             X_parts (List[List[List[secfx]]]): List of X matrices from parties (all combined).
             y_parts (List[List[secfx]]): List of y vectors from parties (all combined).
         """
-        
+
         # Concatenate data from all parties (already flattened)
         X = X_parts[0]  # shape: (n_samples, n_features)
         y = y_parts[0]  # shape: (n_samples,)
@@ -25,7 +45,112 @@ class SecureLinearRegression:
         n_features = len(X[0])
 
         print(f"[Party {mpc.pid}] ✅ Loaded {n_samples} samples, {n_features} features")
-        
+        await self.telemetry.start()
+
+        if self.engine == "array":
+            theta = await self.__fit_array__(X, y)
+        elif self.engine == "gram":
+            theta = await self.__fit_gram__(X, y)
+        else:
+            theta = await self.__fit_scalar__(X, y)
+        await self.telemetry.flush()
+
+        # Reveal model weights to all parties
+        print(f"\n[Party {mpc.pid}] ⌛ Reaching final training epoch...")
+        try:
+            theta_open = await mpc.output(theta)
+            self.theta = [float(t) for t in theta_open]
+            print(f"[Party {mpc.pid}] ✅ Training complete. Model weights: {self.theta}")
+        except Exception as e:
+            print(f"[Party {mpc.pid}] ❗ ERROR during mpc.output: {e}")
+            self.theta = []
+
+    async def __fit_array__(self, X, y):
+        """Gradient descent on secure fixed-point arrays, one matrix product per step.
+
+        With a batch size set, every epoch walks over a jointly agreed permutation
+        of the rows and updates theta once per mini-batch.
+        """
+        X = to_secure_array(self.secfx, X)
+        y = to_secure_array(self.secfx, y)
+        n_samples, n_features = X.shape
+        rng = await joint_rng() if self.batch_size else None
+
+        # Initialize theta (model weights) to zeros
+        theta = self.secfx.array(np.zeros(n_features))
+
+        print(f"\n[Party {mpc.pid}] 🔎 Start learning with {self.epochs} iterations and learning rate {self.lr}")
+        for epoch in range(self.epochs):
+            for X_batch, y_batch in iterate_batches(X, y, self.batch_size, rng):
+                # error = X @ theta - y, gradient = X^T @ error / batch size
+                error = X_batch @ theta - y_batch
+                gradients = (X_batch.T @ error) * (1 / X_batch.shape[0])
+
+                # Update theta
+                theta = theta - gradients * self.lr
+
+            # Logging: Reveal theta (and the sampled loss) in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                self.telemetry.report(epoch, theta, self.__sample_loss__(X, y, theta))
+
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch):
+                # The last mini-batch may be a few leftover rows, so test the full-batch gradient
+                if self.batch_size:
+                    gradients = (X.T @ (X @ theta - y)) * (1 / n_samples)
+                if await self.early_stopping.converged(gradients):
+                    print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} epochs")
+                    break
+
+        return theta
+
+    async def __fit_gram__(self, X, y):
+        """Gradient descent on the secure sufficient statistics X^T X / n and X^T y / n.
+
+        The statistics are computed once with two matrix products, after which every
+        epoch costs O(d²) secure operations regardless of the number of samples. The
+        products and the 1/n scaling run in the wide type, so they neither overflow
+        nor round 1/n to zero for large n.
+        """
+        secwide = wide_type()
+        X_factor = wide_factor(secwide, X)
+        y_wide = to_wide_array(secwide, y)
+        X = to_secure_array(self.secfx, X)
+        y = to_secure_array(self.secfx, y)
+        n_samples, n_features = X.shape
+        inv_n = 1 / n_samples
+
+        print(f"[Party {mpc.pid}] 📐 Computing {n_features}x{n_features} Gram matrix from {n_samples} samples")
+        gram = from_wide_array(self.secfx, weighted_gram(X_factor) * inv_n)
+        moment = from_wide_array(self.secfx, (X_factor.T @ y_wide) * inv_n)
+
+        # Initialize theta (model weights) to zeros
+        theta = self.secfx.array(np.zeros(n_features))
+
+        print(f"\n[Party {mpc.pid}] 🔎 Start learning with {self.epochs} iterations and learning rate {self.lr}")
+        for epoch in range(self.epochs):
+            # gradient = (X^T X theta - X^T y) / n
+            gradients = gram @ theta - moment
+
+            # Update theta
+            theta = theta - gradients * self.lr
+
+            # Logging: Reveal theta (and the sampled loss) in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                self.telemetry.report(epoch, theta, self.__sample_loss__(X, y, theta))
+
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch) and await self.early_stopping.converged(gradients):
+                print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} epochs")
+                break
+
+        return theta
+
+    async def __fit_scalar__(self, X, y):
+        """Gradient descent with per-element secure values (reference implementation)."""
+        n_samples = len(y)
+        n_features = len(X[0])
+
         # Initialize theta (model weights) to zeros
         theta = [self.secfx(0) for _ in range(n_features)]
         lr_sec = self.secfx(self.lr)
@@ -34,7 +159,7 @@ class SecureLinearRegression:
         for epoch in range(self.epochs):
             # Compute predictions: y_pred = X @ theta
             y_pred = [sum(x_i[j] * theta[j] for j in range(n_features)) for x_i in X]
-            
+
             # Compute error = y_pred - y
             error = [y_pred[i] - y[i] for i in range(n_samples)]
 
@@ -46,27 +171,38 @@ class SecureLinearRegression:
 
             # Update theta
             theta = [theta[j] - lr_sec * gradients[j] for j in range(n_features)]
-            
-            # Logging: Print theta every 10 iterations
-            if epoch % 10 == 0 or epoch == self.epochs - 1:
-                theta_debug = await mpc.output(theta)
-                print(f"[Party {mpc.pid}] 🧮 Epoch {epoch + 1}: theta = {[float(t) for t in theta_debug]}")
 
-        # Reveal model weights to all parties
-        print(f"\n[Party {mpc.pid}] ⌛ Reaching final training epoch...")
-        try:
-            theta_open = await mpc.output(theta)
-            self.theta = [float(t) for t in theta_open]
-            print(f"[Party {mpc.pid}] ✅ Training complete. Model weights: {self.theta}")
-        except Exception as e:
-            print(f"[Party {mpc.pid}] ❗ ERROR during mpc.output: {e}")
-            self.theta = []
+            # Logging: Reveal theta in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                self.telemetry.report(epoch, theta)
+
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch) and await self.early_stopping.converged(gradients):
+                print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} epochs")
+                break
+
+        return theta
+
+    def __sample_loss__(self, X, y, theta):
+        """Mean squared error on the telemetry row sample, or None if no sample is configured."""
+        if not self.telemetry.loss_sample:
+            return None
+
+        idx = self.telemetry.sample_indices(X.shape[0])
+        if idx is not None:
+            X, y = X[idx], y[idx]
+        error = X @ theta - y
+        return mpc.np_sum(error * error) * (1 / X.shape[0])
 
     async def predict(self, X_input):
-        """Securely predict using the trained model.
+        """Predict using the trained model.
+
+        The trained weights are public, so plaintext input is scored locally with
+        NumPy. Secure input is scored in MPC and all predictions are revealed with
+        a single mpc.output call.
 
         Args:
-            X_input (List[List[secfx]]): New input data (securely shared, same format).
+            X_input (List[List[float | secfx]]): New input data, plaintext or securely shared.
 
         Returns:
             List[float]: Predicted values.
@@ -74,8 +210,15 @@ class SecureLinearRegression:
         if self.theta is None:
             raise ValueError("Model not trained. Call fit() before predict().")
 
-        theta_sec = [self.secfx(t) for t in self.theta]
-        predictions = [sum(x_i[j] * theta_sec[j] for j in range(len(theta_sec))) for x_i in X_input]
+        if is_public(X_input):
+            return (np.asarray(X_input, dtype=float) @ np.asarray(self.theta)).tolist()
+
+        if self.engine == "scalar":
+            theta_sec = [self.secfx(t) for t in self.theta]
+            predictions = [sum(x_i[j] * theta_sec[j] for j in range(len(theta_sec))) for x_i in X_input]
+        else:
+            X = to_secure_array(self.secfx, X_input)
+            predictions = X @ np.array(self.theta)
 
         try:
             preds_open = await mpc.output(predictions)
@@ -83,3 +226,23 @@ class SecureLinearRegression:
         except Exception as e:
             print(f"[Party {mpc.pid}] ❗ ERROR during prediction output: {e}")
             return []
+
+    async def evaluate(self, X_input, y_input):
+        """Score the model inside MPC and reveal only aggregate metrics.
+
+        Predictions are never opened; MSE, RMSE and R² are computed on the secure
+        predictions and targets and revealed with a single mpc.output call.
+
+        Args:
+            X_input (List[List[float | secfx]]): Evaluation features, plaintext or securely shared.
+            y_input (List[float | secfx]): Evaluation targets, plaintext or securely shared.
+
+        Returns:
+            dict: 'mse', 'rmse' and 'r2'.
+        """
+        if self.theta is None:
+            raise ValueError("Model not trained. Call fit() before evaluate().")
+
+        X = to_secure_array(self.secfx, X_input)
+        y = to_secure_array(self.secfx, y_input)
+        return await secure_regression_metrics(y, X @ np.array(self.theta))
@@ -1,15 +1,58 @@
 # modules/mpc/logistic.py
 
+import numpy as np
 from mpyc.runtime import mpc
-from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR
+from modules.mpc.convergence import EarlyStopping
+from modules.mpc.linalg import inverse_spd, solve_spd
+from modules.mpc.metrics import secure_classification_metrics
+from modules.mpc.minibatch import iterate_batches, joint_rng
+from modules.mpc.secure_array import (
+    from_wide_array, is_public, to_secure_array, to_wide_array, weighted_gram, wide_factor, wide_type
+)
+from modules.mpc.sigmoid import exact_sigmoid, get_sigmoid
+from modules.mpc.telemetry import TrainingTelemetry
+from utils.constant import (
+    DEFAULT_EPOCHS, DEFAULT_LR, DEFAULT_ENGINE, DEFAULT_OPTIMIZER, DEFAULT_RIDGE, DEFAULT_LOG_EVERY,
+    DEFAULT_CHECK_EVERY, DEFAULT_SIGMOID, DEFAULT_SIGMOID_DEGREE, DEFAULT_SIGMOID_INTERVAL, DEFAULT_ROC_BINS
+)
+
+ENGINES = ("array", "scalar")
+OPTIMIZERS = ("gd", "newton", "fixed-hessian")
 
 class SecureLogisticRegression:
-    def __init__(self, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR):
-        self.epochs = epochs
-        self.lr = lr
+    def __init__(self, epochs=DEFAULT_EPOCHS, lr=DEFAULT_LR, engine=DEFAULT_ENGINE, optimizer=DEFAULT_OPTIMIZER,
+                 ridge=DEFAULT_RIDGE, batch_size=None, log_every=DEFAULT_LOG_EVERY, loss_sample=None,
+                 tol=None, check_every=DEFAULT_CHECK_EVERY, sigmoid=DEFAULT_SIGMOID,
+                 sigmoid_degree=DEFAULT_SIGMOID_DEGREE, sigmoid_interval=DEFAULT_SIGMOID_INTERVAL):
+        if engine not in ENGINES:
+            raise ValueError(f"Unsupported training engine: {engine}")
+        if optimizer not in OPTIMIZERS:
+            raise ValueError(f"Unsupported optimizer: {optimizer}")
+        if optimizer != "gd" and engine != "array":
+            raise ValueError(f"Optimizer '{optimizer}' requires the 'array' engine")
+        if batch_size and (engine != "array" or optimizer != "gd"):
+            raise ValueError("Mini-batch training requires the 'array' engine with the 'gd' optimizer")
+
+        self.epochs = epochs  # Number of iterations for the second-order optimizers
+        self.lr = lr  # Unused by the second-order optimizers (full Newton step)
+        self.engine = engine
+        self.optimizer = optimizer
+        self.ridge = ridge  # Damping added to the Hessian diagonal before solving
+        self.batch_size = batch_size  # None means full-batch gradient descent
+        self.telemetry = TrainingTelemetry(  # loss_sample also logs the cross-entropy on that many rows
+            log_every, loss_sample, label="Epoch" if optimizer == "gd" else "Iteration"
+        )
+        self.early_stopping = EarlyStopping(tol, check_every)  # Stop once the gradient norm drops below tol
+        self.sigmoid = get_sigmoid(sigmoid, sigmoid_degree, sigmoid_interval)
+        if optimizer == "newton" and not self.sigmoid.positive_derivative():
+            # A negative IRLS weight can make the Hessian indefinite, and solve_spd does not pivot
+            raise ValueError(
+                f"Optimizer 'newton' requires a sigmoid whose derivative is positive everywhere "
+                f"(e.g. 'taylor5'), got '{sigmoid}'; use 'fixed-hessian' or 'gd' instead"
+            )
         self.theta = None  # Model parameters
         self.secfx = mpc.SecFxp()
-        
+
     def __approx_log__(self, x, terms=5):
         one = self.secfx(1)
         x_minus_1 = x - one
@@ -23,14 +66,6 @@ class SecureLogisticRegression:
             sign *= -1
         return result
 
-    def __approx_sigmoid__(self, x):
-        # 5th-order Taylor approx: sigmoid(x) ≈ 0.5 + 0.25x - x³/48 + x⁵/480
-        const_05 = self.secfx(0.5)
-        const_025 = self.secfx(0.25)
-        x3 = x * x * x
-        x5 = x3 * x * x
-        return const_05 + const_025 * x - (x3 / 48) + (x5 / 480)
-
     async def fit(self, X_parts, y_parts):
         """Securely train logistic regression using gradient descent.
 
@@ -38,7 +73,7 @@ class SecureLogisticRegression:
             X_parts (List[List[List[secfx]]]): List of X matrices from parties (all combined).
             y_parts (List[List[secfx]]): List of y vectors from parties (all combined).
         """
-        
+
         # Concatenate data from all parties (already flattened)
         X = X_parts[0]  # shape: (n_samples, n_features)
         y = y_parts[0]  # shape: (n_samples,)
@@ -46,6 +81,148 @@ class SecureLogisticRegression:
         n_features = len(X[0])
 
         print(f"[Party {mpc.pid}] ✅ Loaded {n_samples} samples, {n_features} features")
+        print(f"[Party {mpc.pid}] 📈 Using '{self.sigmoid.name}' sigmoid: {self.sigmoid.multiplications} multiplications and "
+              f"{self.sigmoid.comparisons} comparisons per sample, "
+              f"max error {self.sigmoid.max_error():.4f} on [-{self.sigmoid.interval:g}, {self.sigmoid.interval:g}]")
+        await self.telemetry.start()
+
+        if self.optimizer != "gd":
+            theta, bias = await self.__fit_newton__(X, y)
+            params = mpc.np_append(theta, bias)
+        elif self.engine == "array":
+            theta, bias = await self.__fit_array__(X, y)
+            params = mpc.np_append(theta, bias)
+        else:
+            theta, bias = await self.__fit_scalar__(X, y)
+            params = theta + [bias]
+        await self.telemetry.flush()
+
+        # Reveal final model weights
+        print(f"\n[Party {mpc.pid}] ⌛ Reaching final training epoch...")
+        try:
+            theta_open = await mpc.output(params)
+            self.theta = [float(t) for t in theta_open]
+            print(f"[Party {mpc.pid}] ✅ Training complete. Model weights: {self.theta}")
+        except Exception as e:
+            print(f"[Party {mpc.pid}] ❗ ERROR during mpc.output: {e}")
+            self.theta = []
+            self.bias = 0.0
+
+    async def __fit_array__(self, X, y):
+        """Gradient descent on secure fixed-point arrays with a batched sigmoid per step.
+
+        With a batch size set, every epoch walks over a jointly agreed permutation
+        of the rows and updates theta and bias once per mini-batch.
+        """
+        X = to_secure_array(self.secfx, X)
+        y = to_secure_array(self.secfx, y)
+        n_samples, n_features = X.shape
+        rng = await joint_rng() if self.batch_size else None
+
+        # Initialize theta (model weights) and bias to zeros, bias kept as a 1-element array
+        theta = self.secfx.array(np.zeros(n_features))
+        bias = self.secfx.array(np.zeros(1))
+
+        print(f"\n[Party {mpc.pid}] 🔎 Start logistic regression with {self.epochs} iterations and learning rate {self.lr}")
+        for epoch in range(self.epochs):
+            for X_batch, y_batch in iterate_batches(X, y, self.batch_size, rng):
+                # Compute predictions: sigmoid(X @ theta + bias) for all rows of the batch at once
+                y_pred = self.sigmoid(X_batch @ theta + bias)
+
+                # Compute error and gradients
+                inv_b = 1 / X_batch.shape[0]
+                error = y_pred - y_batch
+                gradients = (X_batch.T @ error) * inv_b
+                grad_bias = mpc.np_sum(error) * inv_b
+
+                # Update theta and bias
+                theta = theta - gradients * self.lr
+                bias = bias - grad_bias * self.lr
+
+            # Debug: Reveal theta and the sampled loss (if configured) in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                self.telemetry.report(epoch, mpc.np_append(theta, bias), self.__sample_loss__(X, y, theta, bias))
+
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch):
+                # The last mini-batch may be a few leftover rows, so test the full-batch gradient
+                if self.batch_size:
+                    error = self.sigmoid(X @ theta + bias) - y
+                    gradients = (X.T @ error) * (1 / n_samples)
+                    grad_bias = mpc.np_sum(error) * (1 / n_samples)
+                if await self.early_stopping.converged(gradients, grad_bias):
+                    print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} epochs")
+                    break
+
+        return theta, bias
+
+    async def __fit_newton__(self, X, y):
+        """Second-order training on secure arrays, converging in a handful of iterations.
+
+        'newton' is iteratively reweighted least squares: every iteration builds the
+        Hessian X^T W X / n and solves it securely, with W the derivative of the
+        approximated sigmoid. The constructor only allows sigmoids whose derivative is
+        positive for every input, so no clamping comparisons are needed.
+        'fixed-hessian' uses the bound W <= 1/4, so the Hessian is inverted once and
+        each iteration only needs a matrix-vector product. The intercept is fitted
+        through a column of ones appended here and returned as the bias, so callers
+        pass X without one. The sums over all rows and their 1/n
+        scaling run in the wide type, so 1/n does not round to zero for large n; with
+        public X the Hessian only needs d² inner products with public coefficients.
+        """
+        # Fold the intercept into theta through a column of ones
+        if is_public(X):
+            X = np.column_stack((np.asarray(X, dtype=float), np.ones(len(X))))
+        else:
+            X = to_secure_array(self.secfx, X)
+            X = mpc.np_hstack((X, self.secfx.array(np.ones((X.shape[0], 1)))))
+
+        secwide = wide_type()
+        X_factor = wide_factor(secwide, X)
+        X = to_secure_array(self.secfx, X)
+        y = to_secure_array(self.secfx, y)
+        n_samples, n_features = X.shape
+        inv_n = 1 / n_samples
+        damping = self.secfx.array(np.eye(n_features) * self.ridge)
+
+        if self.optimizer == "fixed-hessian":
+            hessian_inv = inverse_spd(from_wide_array(self.secfx, weighted_gram(X_factor) * (inv_n / 4)) + damping)
+
+        # Initialize theta (model weights, bias column included) to zeros
+        theta = self.secfx.array(np.zeros(n_features))
+
+        print(f"\n[Party {mpc.pid}] 🔎 Start logistic regression with {self.epochs} {self.optimizer} iterations")
+        for epoch in range(self.epochs):
+            # Compute predictions and gradient of the mean cross-entropy
+            dot = X @ theta
+            y_pred = self.sigmoid(dot)
+            error = to_wide_array(secwide, y_pred - y)
+            gradients = from_wide_array(self.secfx, (X_factor.T @ error) * inv_n)
+
+            # Newton step: theta -= H^-1 @ gradients
+            if self.optimizer == "fixed-hessian":
+                theta = theta - hessian_inv @ gradients
+            else:
+                weights = to_wide_array(secwide, self.sigmoid.derivative(dot))
+                hessian = from_wide_array(self.secfx, weighted_gram(X_factor, weights) * inv_n) + damping
+                theta = theta - solve_spd(hessian, gradients)
+
+            # Debug: Reveal theta and the sampled loss (if configured) in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                self.telemetry.report(epoch, theta, self.__sample_loss__(X, y, theta))
+
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch) and await self.early_stopping.converged(gradients):
+                print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} iterations")
+                break
+
+        # Split the intercept (weight of the ones column) back off as the bias
+        return theta[:-1], theta[-1:]
+
+    async def __fit_scalar__(self, X, y):
+        """Gradient descent with per-sample secure values (reference implementation)."""
+        n_samples = len(y)
+        n_features = len(X[0])
 
         # Initialize theta (model weights) and bias to zeros
         theta = [self.secfx(0) for _ in range(n_features)]
@@ -55,8 +232,8 @@ class SecureLogisticRegression:
         print(f"\n[Party {mpc.pid}] 🔎 Start logistic regression with {self.epochs} iterations and learning rate {self.lr}")
         for epoch in range(self.epochs):
             # Compute predictions: sigmoid(X @ theta)
-            y_pred = [self.__approx_sigmoid__(sum(x_i[j] * theta[j] for j in range(n_features)) + bias) for x_i in X]
-            
+            y_pred = [self.sigmoid(sum(x_i[j] * theta[j] for j in range(n_features)) + bias) for x_i in X]
+
             # Compute error: y_pred - y
             error = [y_pred[i] - y[i] for i in range(n_samples)]
 
@@ -65,7 +242,7 @@ class SecureLogisticRegression:
                 sum(error[i] * X[i][j] for i in range(n_samples)) / n_samples
                 for j in range(n_features)
             ]
-            
+
             # Compute gradient for bias
             grad_bias = sum(error) / n_samples
 
@@ -73,35 +250,52 @@ class SecureLogisticRegression:
             theta = [theta[j] - lr_sec * gradients[j] for j in range(n_features)]
             bias = bias - lr_sec * grad_bias
 
-            # Debug: Print theta every 10 iterations
-            if epoch % 10 == 0 or epoch == self.epochs - 1:
-                theta_debug = await mpc.output(theta + [bias])
-                epsilon = self.secfx(1e-3)
-                y_pred_clamped = [mpc.max(epsilon, mpc.min(1 - epsilon, yp)) for yp in y_pred]
-                loss_terms = [
-                    y[i] * self.__approx_log__(y_pred_clamped[i]) + (1 - y[i]) * self.__approx_log__(1 - y_pred_clamped[i])
-                    for i in range(n_samples)
-                ]
-                loss = -sum(loss_terms) / n_samples
-                loss_val = await mpc.output(loss)
-                print(f"[Party {mpc.pid}] 🧮 Epoch {epoch + 1}: theta = {[float(t) for t in theta_debug]} | loss = {loss_val}")
+            # Debug: Reveal theta and the sampled loss (if configured) in the background
+            if self.telemetry.should_log(epoch, self.epochs):
+                loss = None
+                if self.telemetry.loss_sample:
+                    idx = self.telemetry.sample_indices(n_samples)
+                    rows = range(n_samples) if idx is None else idx
+                    epsilon = self.secfx(1e-3)
+                    y_pred_clamped = {i: mpc.max(epsilon, mpc.min(1 - epsilon, y_pred[i])) for i in rows}
+                    loss_terms = [
+                        y[i] * self.__approx_log__(y_pred_clamped[i]) + (1 - y[i]) * self.__approx_log__(1 - y_pred_clamped[i])
+                        for i in rows
+                    ]
+                    loss = -sum(loss_terms) / len(rows)
+                self.telemetry.report(epoch, theta + [bias], loss)
 
-        # Reveal final model weights
-        print(f"\n[Party {mpc.pid}] ⌛ Reaching final training epoch...")
-        try:
-            theta_open = await mpc.output(theta + [bias])
-            self.theta = [float(t) for t in theta_open]
-            print(f"[Party {mpc.pid}] ✅ Training complete. Model weights: {self.theta}")
-        except Exception as e:
-            print(f"[Party {mpc.pid}] ❗ ERROR during mpc.output: {e}")
-            self.theta = []
-            self.bias = 0.0
+            # Early stopping: reveal only whether the gradient norm is below tol
+            if self.early_stopping.should_check(epoch) and await self.early_stopping.converged(gradients, grad_bias):
+                print(f"[Party {mpc.pid}] 🛑 Converged after {epoch + 1} epochs")
+                break
+
+        return theta, bias
+
+    def __sample_loss__(self, X, y, theta, bias=0):
+        """Cross-entropy on the telemetry row sample, or None if no sample is configured."""
+        if not self.telemetry.loss_sample:
+            return None
+
+        idx = self.telemetry.sample_indices(X.shape[0])
+        if idx is not None:
+            X, y = X[idx], y[idx]
+
+        epsilon = 1e-3
+        y_pred = self.sigmoid(X @ theta + bias)
+        y_pred_clamped = mpc.np_maximum(mpc.np_minimum(y_pred, 1 - epsilon), epsilon)
+        loss_terms = y * self.__approx_log__(y_pred_clamped) + (1 - y) * self.__approx_log__(1 - y_pred_clamped)
+        return -mpc.np_sum(loss_terms) * (1 / X.shape[0])
 
     async def predict(self, X_input):
-        """Securely predict using the trained model.
+        """Predict using the trained model.
+
+        The trained weights are public, so plaintext input is scored locally with
+        NumPy and the exact sigmoid. Secure input is scored in MPC with the
+        approximated sigmoid and all outputs are revealed with a single mpc.output call.
 
         Args:
-            X_input (List[List[secfx]]): New input data (securely shared, same format).
+            X_input (List[List[float | secfx]]): New input data, plaintext or securely shared.
 
         Returns:
             List[int]: Binary predictions (0 or 1).
@@ -109,15 +303,46 @@ class SecureLogisticRegression:
         if self.theta is None:
             raise ValueError("Model not trained. Call fit() before predict().")
 
-        # Convert public model params back into secure fixed-point values
-        secfx_theta = [self.secfx(w) for w in self.theta]
+        # Weights followed by the bias term
+        weights, bias = np.array(self.theta[:-1]), self.theta[-1]
+
+        if is_public(X_input):
+            sigmoid_outputs = exact_sigmoid(np.asarray(X_input, dtype=float) @ weights + bias)
+        elif self.engine == "array":
+            # Evaluate all rows in one batch
+            X = to_secure_array(self.secfx, X_input)
+            sigmoid_outputs = await mpc.output(self.sigmoid(X @ weights + bias))
+        else:
+            # Convert public model params back into secure fixed-point values
+            secfx_theta = [self.secfx(w) for w in self.theta]
 
-        sigmoid_outputs = []
-        for x in X_input:
-            dot = sum(a * b for a, b in zip(x, secfx_theta))
-            sigmoid = self.__approx_sigmoid__(dot)
-            sigmoid_outputs.append(await mpc.output(sigmoid))
+            sigmoids = []
+            for x in X_input:
+                dot = sum(a * b for a, b in zip(x, secfx_theta[:-1])) + secfx_theta[-1]
+                sigmoids.append(self.sigmoid(dot))
+            sigmoid_outputs = await mpc.output(sigmoids)
 
         y_pred = [1 if p >= 0.5 else 0 for p in sigmoid_outputs]
         return y_pred
 
+    async def evaluate(self, X_input, y_input, bins=DEFAULT_ROC_BINS):
+        """Score the model inside MPC and reveal only aggregate metrics.
+
+        Probabilities are computed with the approximated sigmoid and never opened;
+        the confusion counts and a binned ROC curve are revealed in one mpc.output call.
+
+        Args:
+            X_input (List[List[float | secfx]]): Evaluation features, plaintext or securely shared.
+            y_input (List[float | secfx]): Binary evaluation labels, plaintext or securely shared.
+            bins (int): Number of score bins for the ROC curve.
+
+        Returns:
+            dict: See secure_classification_metrics.
+        """
+        if self.theta is None:
+            raise ValueError("Model not trained. Call fit() before evaluate().")
+
+        weights, bias = np.array(self.theta[:-1]), self.theta[-1]
+        X = to_secure_array(self.secfx, X_input)
+        y = to_secure_array(self.secfx, y_input)
+        return await secure_classification_metrics(y, self.sigmoid(X @ weights + bias), bins)
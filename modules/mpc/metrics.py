@@ -0,0 +1,101 @@
+# modules/mpc/metrics.py
+
+"""Secure evaluation metrics computed inside MPC.
+
+Predictions and labels stay secret shared; only a constant number of aggregate
+values is opened with a single mpc.output call, instead of one value per row.
+"""
+
+import math
+import numpy as np
+from mpyc.runtime import mpc
+from modules.mpc.secure_array import to_wide_array, wide_type
+from utils.constant import DEFAULT_ROC_BINS
+
+async def secure_regression_metrics(y_true, y_pred):
+    """MSE, RMSE and R² of secure predictions against secure targets.
+
+    Args:
+        y_true (secfx.array): Secure target values.
+        y_pred (secfx.array): Secure predicted values.
+
+    Returns:
+        dict: Revealed 'mse', 'rmse' and 'r2'.
+    """
+    n_samples = y_true.shape[0]
+
+    # Accumulate in the wide type: the sums of squares stay in range for large
+    # targets, and 1/n keeps its precision where the training type rounds it to zero
+    secwide = wide_type()
+    y_true = to_wide_array(secwide, y_true)
+    y_pred = to_wide_array(secwide, y_pred)
+    error = y_pred - y_true
+    centered = y_true - mpc.np_sum(y_true) * (1 / n_samples)
+
+    # R² = 1 - MSE / Var(y). Given MSE and R², Var(y) follows, so opening the two
+    # sums reveals nothing more and the divisions by n run in plaintext
+    squared_error, squared_deviation = (float(v) for v in await mpc.output([error @ error, centered @ centered]))
+    mse_open = squared_error / n_samples
+    variance_open = squared_deviation / n_samples
+    return {
+        "mse": mse_open,
+        "rmse": math.sqrt(max(mse_open, 0.0)),
+        "r2": 1 - mse_open / variance_open if variance_open else 0.0
+    }
+
+async def secure_classification_metrics(y_true, y_score, bins=DEFAULT_ROC_BINS):
+    """Accuracy, precision, recall and a binned ROC curve of secure scores.
+
+    All thresholds, including the 0.5 decision threshold, are compared in one
+    vectorized batch. Per threshold only the true positive and predicted positive
+    counts are revealed, so the output is O(bins) values regardless of n.
+
+    Args:
+        y_true (secfx.array): Secure binary labels (0 or 1).
+        y_score (secfx.array): Secure predicted probabilities.
+        bins (int): Number of equal-width score bins for the ROC curve.
+
+    Returns:
+        dict: Revealed 'accuracy', 'precision', 'recall', 'f1', the confusion
+            counts 'tp', 'fp', 'fn', 'tn', and the ROC points 'thresholds',
+            'fpr', 'tpr' with their trapezoidal 'auc'.
+    """
+    n_samples = y_true.shape[0]
+    thresholds = np.union1d(np.linspace(0, 1, bins + 1)[1:-1], [0.5])
+    decision = int(np.searchsorted(thresholds, 0.5))
+
+    # above[i, k] = 1 if the score of row i reaches threshold k
+    above = mpc.np_reshape(y_score, (n_samples, 1)) >= thresholds
+    true_positives = y_true @ above
+    predicted_positives = mpc.np_sum(above, axis=0)
+    positives = mpc.np_sum(mpc.np_reshape(y_true, (n_samples, 1)), axis=0)  # Shape (1,) to stack with the counts
+
+    counts = await mpc.output(mpc.np_hstack((true_positives, predicted_positives, positives)))
+    counts = np.rint(np.asarray(counts, dtype=float)).astype(int)
+    k = len(thresholds)
+    tp_k, pp_k, pos = counts[:k], counts[k:2 * k], int(counts[-1])
+    neg = n_samples - pos
+
+    tp = int(tp_k[decision])
+    fp = int(pp_k[decision]) - tp
+    fn = pos - tp
+    tn = neg - fp
+    precision = tp / (tp + fp) if tp + fp else 0.0
+    recall = tp / pos if pos else 0.0
+
+    # ROC points ordered from the strictest to the loosest threshold, plus both corners
+    tpr = np.concatenate(([0.0], (tp_k / pos if pos else np.zeros(k))[::-1], [1.0]))
+    fpr = np.concatenate(([0.0], ((pp_k - tp_k) / neg if neg else np.zeros(k))[::-1], [1.0]))
+    auc = float(np.sum(np.diff(fpr) * (tpr[1:] + tpr[:-1]) / 2))
+
+    return {
+        "accuracy": (tp + tn) / n_samples,
+        "precision": precision,
+        "recall": recall,
+        "f1": 2 * precision * recall / (precision + recall) if precision + recall else 0.0,
+        "tp": tp, "fp": fp, "fn": fn, "tn": tn,
+        "thresholds": thresholds[::-1].tolist(),
+        "fpr": fpr.tolist(),
+        "tpr": tpr.tolist(),
+        "auc": auc
+    }
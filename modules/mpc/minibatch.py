@@ -0,0 +1,41 @@
+# modules/mpc/minibatch.py
+
+import numpy as np
+from mpyc import random as securerandom
+from mpyc.runtime import mpc
+
+async def joint_rng(bits=31):
+    """Create a random generator whose seed is jointly generated by all parties.
+
+    The seed is drawn as a secure random integer and then revealed, so every party
+    derives the same permutations and no single party can choose them.
+
+    Returns:
+        numpy.random.Generator: Generator with the same state on every party.
+    """
+    secint = mpc.SecInt(bits + 1)
+    seed = await mpc.output(securerandom.getrandbits(secint, bits))
+    return np.random.default_rng(int(seed))
+
+def iterate_batches(X, y, batch_size=None, rng=None):
+    """Yield (X_batch, y_batch) pairs for one pass over the data.
+
+    With no batch size (or one covering all rows) the full arrays are yielded once,
+    which is plain full-batch gradient descent. Otherwise the rows are visited in
+    a fresh permutation drawn from the shared generator.
+
+    Args:
+        X (secfx.array): Secure (n_samples, n_features) matrix.
+        y (secfx.array): Secure (n_samples,) vector.
+        batch_size (int, optional): Rows per batch; the last batch may be smaller.
+        rng (numpy.random.Generator, optional): Generator shared by all parties.
+    """
+    n_samples = X.shape[0]
+    if not batch_size or batch_size >= n_samples:
+        yield X, y
+        return
+
+    permutation = rng.permutation(n_samples)
+    for start in range(0, n_samples, batch_size):
+        idx = permutation[start:start + batch_size]
+        yield X[idx], y[idx]
@@ -0,0 +1,115 @@
+# modules/mpc/secure_array.py
+
+import numpy as np
+from mpyc.runtime import mpc
+from mpyc.sectypes import SecureObject
+
+# Wide fixed-point type for sums over all rows: the sums stay in range and a public
+# factor like 1/n keeps its precision, where the 32-bit training type would round
+# it to zero beyond 2^16 rows
+WIDE_BITS = 96
+WIDE_FRAC_BITS = 32
+GRAM_CHUNK_ROWS = 4096  # Rows per block of public outer products in weighted_gram
+
+def wide_type():
+    return mpc.SecFxp(l=WIDE_BITS, f=WIDE_FRAC_BITS)
+
+def to_secure_array(secfx, data):
+    """Convert a matrix or vector into a secure fixed-point array.
+
+    Args:
+        secfx: MPyC secure fixed-point type used by the model.
+        data: Secure array, NumPy array, or (nested) list of floats or secfx values.
+
+    Returns:
+        secfx.array: The same data as a secure fixed-point array.
+    """
+    if isinstance(data, secfx.array):
+        return data
+    if isinstance(data, np.ndarray) and data.dtype.kind in "biuf":
+        return secfx.array(data.astype(float, copy=False))  # Plain numeric matrix, no per-element checks
+
+    values = np.asarray(data, dtype=object)
+    if any(isinstance(v, secfx) for v in values.flat):
+        return mpc.np_reshape(mpc.np_fromlist(list(values.flat)), values.shape)
+    return secfx.array(values.astype(float))
+
+def is_public(data):
+    """Check whether data holds only plaintext numbers (no secure values).
+
+    Args:
+        data: Secure array, NumPy array, or (nested) list of floats or secure values.
+
+    Returns:
+        bool: True if the data can be processed locally without MPC.
+    """
+    if isinstance(data, SecureObject):
+        return False
+    if isinstance(data, np.ndarray) and data.dtype.kind in "biuf":
+        return True
+    return not any(isinstance(v, SecureObject) for v in np.asarray(data, dtype=object).flat)
+
+def to_wide_array(secwide, data):
+    """Convert a matrix or vector into the wide fixed-point type.
+
+    Public data is encoded directly; secure values are converted element-wise,
+    which costs a conversion protocol per element.
+
+    Args:
+        secwide: Wide MPyC secure fixed-point type (see wide_type()).
+        data: Secure array, NumPy array, or (nested) list of floats or secure values.
+
+    Returns:
+        secwide.array: The same data in the wide type.
+    """
+    if is_public(data):
+        return secwide.array(np.asarray(data, dtype=float))
+    if isinstance(data, SecureObject):
+        shape = data.shape
+        values = mpc.np_tolist(mpc.np_reshape(data, (-1,)))
+    else:
+        values = np.asarray(data, dtype=object)
+        shape = values.shape
+        values = list(values.flat)
+    return mpc.np_reshape(mpc.np_fromlist(mpc.convert(values, secwide)), shape)
+
+def from_wide_array(secfx, data):
+    """Convert a wide secure array (or a public result) back into the model's fixed-point type."""
+    if isinstance(data, np.ndarray):
+        return secfx.array(data)
+    values = mpc.np_tolist(mpc.np_reshape(data, (-1,)))
+    return mpc.np_reshape(mpc.np_fromlist(mpc.convert(values, secfx)), data.shape)
+
+def wide_factor(secwide, X):
+    """Matrix operand for sums over all rows.
+
+    Public X stays a float matrix, so products with it need no secure
+    multiplications; secure X is converted to the wide type.
+    """
+    return np.asarray(X, dtype=float) if is_public(X) else to_wide_array(secwide, X)
+
+def weighted_gram(X, weights=None):
+    """Sum over all rows of w_i x_i x_i^T (or of x_i x_i^T without weights).
+
+    Args:
+        X: Operand from wide_factor(), shape (n, d).
+        weights: Optional wide secure array of shape (n,).
+
+    Returns:
+        The (d, d) sum: public if X is public and unweighted, otherwise a wide secure array.
+    """
+    n_samples, n_features = X.shape
+    if weights is None:
+        return X.T @ X
+    if not isinstance(X, np.ndarray):
+        return X.T @ (X * mpc.np_reshape(weights, (n_samples, 1)))
+
+    # Public X: one inner product of the weights with the public outer products per
+    # entry, instead of a secure product per element of X
+    total = None
+    for start in range(0, n_samples, GRAM_CHUNK_ROWS):
+        rows = X[start:start + GRAM_CHUNK_ROWS]
+        outer = (rows[:, :, None] * rows[:, None, :]).reshape(len(rows), n_features * n_features)
+        block = weights[start:start + len(rows)] @ outer
+        total = block if total is None else total + block
+    return mpc.np_reshape(total, (n_features, n_features))
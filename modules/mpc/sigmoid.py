@@ -0,0 +1,153 @@
+# modules/mpc/sigmoid.py
+
+"""Secure sigmoid approximations for logistic regression.
+
+Costs are per evaluated element; "multiplications" are secret x secret products,
+"comparisons" secure comparisons, and "depth" the number of sequential rounds,
+counting one per multiplication and c per comparison (c is the round count of one
+secure comparison). The error column is the maximum absolute error against the
+exact sigmoid on the given interval.
+
+    method       multiplications   comparisons  depth    max error
+    taylor5      3                 0            3        0.019 on [-2, 2], diverges beyond (1.3 on [-4, 4])
+    taylor3      2                 0            2        0.048 on [-2, 2], diverges beyond (0.82 on [-4, 4])
+    piecewise    2                 2            2 + 2c   0.12 everywhere (clamp of 0.5 + x/4 to [0, 1])
+    chebyshev    (degree + 1) / 2  0            same     0.062 on [-8, 8] for degree 5, 0.030 for degree 7,
+                                                         0.013 for degree 9
+
+The class attributes multiplications, comparisons and depth hold the same figures,
+depth in multiplication rounds only. Call max_error() for the
+exact figure of a configured approximation.
+
+Outside their interval, polynomials of degree 1 mod 4 (taylor5, chebyshev 5 and 9)
+grow towards the correct side, so gradient descent pushes wayward inputs back.
+Degrees 3 mod 4 (taylor3, chebyshev 3 and 7) turn the wrong way and diverge unless
+the inputs stay inside the interval (small learning rates, well normalized data).
+
+The Newton optimizer uses the derivative as IRLS weight and needs it positive on
+the whole real line (positive_derivative()). taylor5 qualifies; Chebyshev fits
+wiggle around the true slope and qualify only for some degrees and intervals.
+"""
+
+import numpy as np
+from numpy.polynomial import Chebyshev, Polynomial
+from mpyc.runtime import mpc
+from utils.constant import DEFAULT_SIGMOID, DEFAULT_SIGMOID_DEGREE, DEFAULT_SIGMOID_INTERVAL
+
+SIGMOIDS = ("taylor5", "taylor3", "piecewise", "chebyshev")
+
+def exact_sigmoid(x):
+    return 1 / (1 + np.exp(-x))
+
+class PolynomialSigmoid:
+    """sigmoid(x) ≈ 0.5 + t * q(t²) with t = x / scale, evaluated in Horner form.
+
+    Only odd powers are kept (sigmoid - 0.5 is odd), so a degree 2k+1 polynomial
+    costs one squaring plus k secure multiplications.
+    """
+
+    def __init__(self, name, odd_coefficients, scale=1.0, interval=2.0):
+        self.name = name
+        self.coefficients = odd_coefficients  # Coefficients of t, t³, t⁵, ...
+        self.scale = scale
+        self.interval = interval  # Range the approximation is meant for
+        self.multiplications = len(odd_coefficients)
+        self.comparisons = 0
+        self.depth = len(odd_coefficients)
+
+    def __call__(self, x):
+        t = x * (1 / self.scale) if self.scale != 1 else x
+        t2 = t * t
+        q = self.__horner__(t2, self.coefficients)
+        return t * q + 0.5
+
+    def derivative(self, x):
+        """Derivative of the polynomial, used as IRLS weight by the Newton optimizer."""
+        # d/dx of c_k t^(2k+1) is (2k+1) c_k t^(2k) / scale
+        derivative_coefficients = [(2 * k + 1) * c / self.scale for k, c in enumerate(self.coefficients)]
+        t = x * (1 / self.scale) if self.scale != 1 else x
+        return self.__horner__(t * t, derivative_coefficients)
+
+    def positive_derivative(self):
+        """True if the derivative is positive for every real input, not only on the interval."""
+        # The derivative is a polynomial in u = t² >= 0: positive at u = 0 and without a root for u >= 0
+        derivative_coefficients = [(2 * k + 1) * c for k, c in enumerate(self.coefficients)]
+        if derivative_coefficients[0] <= 0:
+            return False
+        roots = Polynomial(derivative_coefficients).roots()
+        return not any(abs(r.imag) < 1e-12 and r.real >= 0 for r in roots)
+
+    def __horner__(self, t2, coefficients):
+        result = coefficients[-1]
+        for c in reversed(coefficients[:-1]):
+            result = t2 * result + c
+        return result
+
+    def evaluate_plain(self, x):
+        t = np.asarray(x) / self.scale
+        return 0.5 + t * sum(c * t ** (2 * k) for k, c in enumerate(self.coefficients))
+
+    def max_error(self, interval=None):
+        r = self.interval if interval is None else interval
+        grid = np.linspace(-r, r, 4001)
+        return float(np.max(np.abs(self.evaluate_plain(grid) - exact_sigmoid(grid))))
+
+class PiecewiseSigmoid:
+    """sigmoid(x) ≈ clamp(0.5 + x / 4, 0, 1), bounded for every input."""
+
+    name = "piecewise"
+    multiplications = 2  # One selection product per clamp
+    comparisons = 2
+    depth = 2  # Plus the rounds of the two comparisons, which run one after the other
+    interval = 2.0  # Half-width of the linear segment
+
+    def __call__(self, x):
+        linear = x * 0.25 + 0.5
+        if hasattr(linear, "shape"):
+            return mpc.np_minimum(mpc.np_maximum(linear, 0), 1)
+        return mpc.min(mpc.max(linear, 0), 1)
+
+    def derivative(self, x):
+        return None  # Flat segments have zero curvature, unusable as IRLS weights
+
+    def positive_derivative(self):
+        return False
+
+    def evaluate_plain(self, x):
+        return np.clip(np.asarray(x) * 0.25 + 0.5, 0, 1)
+
+    def max_error(self, interval=None):
+        r = 4 * self.interval if interval is None else interval
+        grid = np.linspace(-r, r, 4001)
+        return float(np.max(np.abs(self.evaluate_plain(grid) - exact_sigmoid(grid))))
+
+def chebyshev_sigmoid(degree, interval):
+    """Chebyshev interpolant of sigmoid on [-interval, interval], close to minimax."""
+    if degree < 1 or degree % 2 == 0:
+        raise ValueError(f"Chebyshev sigmoid degree must be odd, got {degree}")
+
+    # Fit in t = x / interval so coefficients stay well inside fixed-point range
+    fit = Chebyshev.interpolate(lambda t: exact_sigmoid(t * interval) - 0.5, degree)
+    power = fit.convert(kind=Polynomial).coef
+    odd_coefficients = [float(power[k]) for k in range(1, degree + 1, 2)]
+    return PolynomialSigmoid("chebyshev", odd_coefficients, scale=interval, interval=interval)
+
+def get_sigmoid(method=DEFAULT_SIGMOID, degree=DEFAULT_SIGMOID_DEGREE, interval=DEFAULT_SIGMOID_INTERVAL):
+    """Build the sigmoid approximation selected by name.
+
+    Args:
+        method (str): One of 'taylor5', 'taylor3', 'piecewise' or 'chebyshev'.
+        degree (int): Odd polynomial degree for 'chebyshev'.
+        interval (float): Fitting half-width for 'chebyshev'.
+    """
+    if method == "taylor5":
+        # 0.5 + x/4 - x³/48 + x⁵/480
+        return PolynomialSigmoid("taylor5", [1 / 4, -1 / 48, 1 / 480])
+    if method == "taylor3":
+        # 0.5 + x/4 - x³/48
+        return PolynomialSigmoid("taylor3", [1 / 4, -1 / 48])
+    if method == "piecewise":
+        return PiecewiseSigmoid()
+    if method == "chebyshev":
+        return chebyshev_sigmoid(degree, interval)
+    raise ValueError(f"Unsupported sigmoid approximation: {method}")
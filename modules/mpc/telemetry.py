@@ -0,0 +1,57 @@
+# modules/mpc/telemetry.py
+
+import asyncio
+import numpy as np
+from mpyc.runtime import mpc
+from modules.mpc.minibatch import joint_rng
+from utils.constant import DEFAULT_LOG_EVERY
+
+class TrainingTelemetry:
+    """Debug output for training loops that never blocks the secure computation.
+
+    Values are revealed with mpc.output but not awaited inside the training loop;
+    each log line is printed by a background task once its outputs arrive, and
+    flush() waits for all of them at the end of training.
+    """
+
+    def __init__(self, log_every=DEFAULT_LOG_EVERY, loss_sample=None, label="Epoch"):
+        self.log_every = log_every  # 0 or None disables telemetry
+        self.loss_sample = loss_sample  # Rows used for the loss estimate, None logs theta only
+        self.label = label
+        self.rng = None
+        self.pending = []
+
+    async def start(self):
+        """Agree on a shared generator when the loss is estimated on a subsample."""
+        if self.log_every and self.loss_sample:
+            self.rng = await joint_rng()
+
+    def should_log(self, epoch, epochs):
+        if not self.log_every:
+            return False
+        return epoch % self.log_every == 0 or epoch == epochs - 1
+
+    def sample_indices(self, n_samples):
+        """Public row indices for the loss estimate, or None to use every row."""
+        if not self.loss_sample or self.loss_sample >= n_samples:
+            return None
+        return np.sort(self.rng.choice(n_samples, self.loss_sample, replace=False))
+
+    def report(self, epoch, theta, loss=None):
+        """Schedule the reveal of theta (and loss) and print it when it arrives."""
+        outputs = [mpc.output(theta)]
+        if loss is not None:
+            outputs.append(mpc.output(loss))
+        self.pending.append(asyncio.ensure_future(self.__print__(epoch, outputs)))
+
+    async def __print__(self, epoch, outputs):
+        theta_debug, *loss_val = await asyncio.gather(*outputs)
+        line = f"[Party {mpc.pid}] 🧮 {self.label} {epoch + 1}: theta = {[float(t) for t in theta_debug]}"
+        if loss_val:
+            line += f" | loss = {float(loss_val[0])}"
+        print(line)
+
+    async def flush(self):
+        """Wait until every scheduled log line has been printed."""
+        await asyncio.gather(*self.pending)
+        self.pending = []
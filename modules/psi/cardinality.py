@@ -0,0 +1,55 @@
+# modules/psi/cardinality.py
+
+import math
+from hashlib import sha256
+from mpyc.runtime import mpc
+from .distributed_psi import ring_encrypt
+from .ecc import fingerprint, pack_fingerprints, unpack_fingerprints
+from .party import Party
+
+SAMPLE_TAG = b"mpc-for-ppml/psi/sample"
+
+def in_sample(value: str, rate: float):
+    """Consistent sampling: an ID is kept by every party or by none, since it only depends on the ID."""
+    return int.from_bytes(sha256(SAMPLE_TAG + value.encode()).digest()[:8], 'big') < rate * 2 ** 64
+
+async def estimate_intersection_size(user_ids: list[str], sample_size: int, workers: int = 1, cache=None):
+    """Estimate the intersection cardinality from a small blinded sample.
+
+    Parties agree on a sampling rate so that the largest set contributes about
+    sample_size IDs, keep the IDs whose public hash falls below that rate, and
+    run the distributed PSI ring on the samples only. Since sampling is
+    consistent, every common ID survives in all samples together, so the sample
+    intersection divided by the rate estimates the full intersection. The cost
+    is that of a PSI over sample_size IDs, and only fingerprints of the sample
+    are exchanged.
+
+    Args:
+        user_ids (List[str]): IDs held by the local party.
+        sample_size (int): Target number of sampled IDs for the largest party.
+        workers (int): Worker processes for the local scalar multiplications.
+        cache (HashedIdCache): Optional persistent cache of hashed IDs.
+
+    Returns:
+        dict: 'estimate' and its 'stderr', the sampling 'rate', the number of
+            sampled common IDs 'matched' and the set 'sizes' of all parties.
+    """
+    sizes = await mpc.transfer(len(user_ids))
+    rate = min(1.0, sample_size / max(max(sizes), 1))
+    sample = [uid for uid in user_ids if in_sample(uid, rate)]
+
+    party = Party(mpc.pid, sample, workers, cache)
+    current = await ring_encrypt(party)
+    buffers = await mpc.transfer(pack_fingerprints([fingerprint(p) for p in current]))
+
+    full_sets = [set(unpack_fingerprints(b)) for b in buffers]
+    matched = len(set.intersection(*full_sets))
+
+    # Each common ID is sampled independently with probability rate (binomial)
+    return {
+        "estimate": matched / rate,
+        "stderr": math.sqrt(matched * (1 - rate)) / rate,
+        "rate": rate,
+        "matched": matched,
+        "sizes": sizes
+    }
@@ -0,0 +1,79 @@
+# modules/psi/distributed_psi.py
+
+import secrets
+from mpyc.runtime import mpc
+from .ecc import fingerprint, pack_fingerprints, pack_points, unpack_fingerprints, unpack_points
+from .party import Party
+
+def ring_topology(n_parties):
+    """Every party sends to its successor and receives from its predecessor."""
+    return {i: [(i + 1) % n_parties] for i in range(n_parties)}
+
+async def ring_encrypt(party: Party):
+    """Pass encrypted sets around the ring until each is encrypted under all keys.
+
+    Args:
+        party (Party): The local party, whose encrypted set enters the ring.
+
+    Returns:
+        List[Point]: The set of the successor party, encrypted under every key and
+            still in the successor's (shuffled) order.
+    """
+    n_parties = len(mpc.parties)
+    ring = ring_topology(n_parties)
+
+    # Round 0: own set under own key, then N - 1 hops of re-encryption
+    current = party.get_encrypted_set()
+    for hop in range(n_parties - 1):
+        received = await mpc.transfer(pack_points(current), sender_receivers=ring)
+        current = party.re_encrypt(unpack_points(received[0]))
+        print(f"[Party {mpc.pid}] 🔁 Re-encrypted set of Party {(mpc.pid - hop - 1) % n_parties} ({len(current)} items)")
+    return current
+
+async def run_distributed_psi(user_ids: list[str], workers: int = 1, cache=None):
+    """Distributed N-party PSI where every party holds only its own key.
+
+    Each party encrypts its own hashed IDs, then the encrypted sets travel around
+    the ring for N - 1 rounds, each hop re-encrypting the set it receives with its
+    own key. After the last hop every set is encrypted under all N keys and only
+    its 16-byte fingerprints are broadcast. Only the owner of a set can map its
+    positions back to IDs, so raw IDs never leave their owner and each party
+    performs N · n exponentiations instead of N² · n.
+
+    Each party deduplicates its IDs and shuffles them before encrypting, keeping
+    the permutation locally, so the positions that fall in the intersection say
+    nothing about its row order: parties learn the set sizes and the intersection
+    size, but not which rows of another party matched. Every message is a single bytes
+    buffer: 33-byte compressed points on the ring, fingerprints in the last round.
+
+    Args:
+        user_ids (List[str]): IDs held by the local party.
+        workers (int): Worker processes for the local scalar multiplications.
+        cache (HashedIdCache): Optional persistent cache of hashed IDs.
+
+    Returns:
+        List[str]: The local IDs in the intersection, ordered by their
+            fingerprint so that all parties agree on the row order.
+    """
+    n_parties = len(mpc.parties)
+
+    # Drop duplicate IDs (keeping the first) and hide the row order behind a local shuffle
+    shuffled_ids = list(dict.fromkeys(user_ids))
+    secrets.SystemRandom().shuffle(shuffled_ids)
+    party = Party(mpc.pid, shuffled_ids, workers, cache)
+    if cache is not None:
+        print(f"[Party {mpc.pid}] 🗃️ Hashed-ID cache hits: {party.cache_hits}/{len(shuffled_ids)}")
+    current = await ring_encrypt(party)
+
+    # Every party now holds the set of its successor under all keys
+    buffers = await mpc.transfer(pack_fingerprints([fingerprint(p) for p in current]))
+    full_sets = [unpack_fingerprints(b) for b in buffers]
+    own_index = (mpc.pid - 1) % n_parties  # Index of the party that finished our set
+    own_set = full_sets[own_index]
+    other_sets = [set(s) for i, s in enumerate(full_sets) if i != own_index]
+
+    matched = sorted(
+        (fp, uid) for fp, uid in zip(own_set, shuffled_ids)
+        if all(fp in s for s in other_sets)
+    )
+    return [uid for _, uid in matched]
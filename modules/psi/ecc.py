@@ -2,27 +2,99 @@
 
 import secrets
 from tinyec import registry
+from tinyec.ec import Point
 from hashlib import sha256
+from . import p256
+from utils.constant import DEFAULT_EC_BACKEND
 
 curve = registry.get_curve("secp256r1")
 
+# 'native' uses the Jacobian/wNAF arithmetic in p256.py, 'tinyec' the library's affine double-and-add
+EC_BACKENDS = ("native", "tinyec")
+ec_backend = DEFAULT_EC_BACKEND
+
+def set_ec_backend(name):
+    global ec_backend
+    if name not in EC_BACKENDS:
+        raise ValueError(f"Unsupported EC backend: {name}")
+    ec_backend = name
+
 def generate_private_key():
     # Generate secure random scalar within the curve order
     return secrets.randbelow(curve.field.n - 1) + 1
 
+HASH_TO_CURVE_TAG = b"mpc-for-ppml/psi/secp256r1/try-and-increment"
+
 def hash_to_point(value: str):
-    # Hash string to integer, then multiply with base point
-    digest = sha256(value.encode()).hexdigest()
-    int_val = int(digest, 16)
-    return int_val * curve.g
+    """Map a string to a curve point whose discrete log is unknown.
+
+    Try-and-increment: hash (tag, counter, value) to an x coordinate until
+    x³ + ax + b is a square, then take the square root as y, which costs one
+    modular exponentiation since p ≡ 3 (mod 4). About two attempts are needed
+    on average, far cheaper than a scalar multiplication of the generator.
+    """
+    data = value.encode()
+    counter = 0
+    while True:
+        digest = sha256(HASH_TO_CURVE_TAG + counter.to_bytes(4, 'big') + data).digest()
+        x = int.from_bytes(digest, 'big') % p256.P
+        y = p256.lift_x(x)
+        if y is not None:
+            # Pick the root whose parity matches a digest bit, so the point is deterministic
+            if (y & 1) != (digest[-1] & 1):
+                y = p256.P - y
+            return Point(curve, x, y)
+        counter += 1
 
 def encrypt_point(point, private_scalar):
+    if ec_backend == "native":
+        x, y = p256.scalar_mult(private_scalar, (point.x, point.y))
+        return Point(curve, x, y)
     return private_scalar * point
 
+FINGERPRINT_BYTES = 16  # 128-bit fingerprints, collisions are negligible even for billions of IDs
+
+def point_to_compressed_bytes(point):
+    # SEC1 compressed form: 0x02 or 0x03 (parity of y) followed by x
+    return bytes([2 + (point.y & 1)]) + point.x.to_bytes(32, 'big')
+
+def compressed_bytes_to_point(b):
+    x = int.from_bytes(b[1:33], 'big')
+    y = p256.lift_x(x)
+    if y is None or b[0] not in (2, 3):
+        raise ValueError("Invalid compressed point")
+    if (y & 1) != (b[0] & 1):
+        y = p256.P - y
+    return Point(curve, x, y)
+
+def fingerprint(point):
+    """Fixed-width binary fingerprint of a point, used to intersect encrypted sets."""
+    return sha256(point_to_compressed_bytes(point)).digest()[:FINGERPRINT_BYTES]
+
 def point_to_bytes(point):
     return point.x.to_bytes(32, 'big') + point.y.to_bytes(32, 'big')
 
 def bytes_to_point(b):
     x = int.from_bytes(b[:32], 'big')
     y = int.from_bytes(b[32:], 'big')
-    return curve.point(x, y)
+    return Point(curve, x, y)
+
+COMPRESSED_POINT_BYTES = 33
+
+def pack_points(points):
+    """Pack points into one contiguous buffer of 33-byte compressed encodings."""
+    return b"".join(point_to_compressed_bytes(p) for p in points)
+
+def unpack_points(buffer):
+    size = COMPRESSED_POINT_BYTES
+    if len(buffer) % size:
+        raise ValueError(f"Point buffer length {len(buffer)} is not a multiple of {size}")
+    return [compressed_bytes_to_point(buffer[i:i + size]) for i in range(0, len(buffer), size)]
+
+def pack_fingerprints(fingerprints):
+    """Pack fixed-width fingerprints into one contiguous buffer."""
+    return b"".join(fingerprints)
+
+def unpack_fingerprints(buffer):
+    size = FINGERPRINT_BYTES
+    return [buffer[i:i + size] for i in range(0, len(buffer), size)]
@@ -0,0 +1,87 @@
+# modules/psi/hash_cache.py
+
+import sqlite3
+import time
+from hashlib import sha256
+from .ecc import HASH_TO_CURVE_TAG, bytes_to_point, hash_to_point, point_to_bytes
+
+# Bump when hash_to_point changes, so stale entries are never hit and age out
+HASH_CACHE_VERSION = b"secp256r1|" + HASH_TO_CURVE_TAG
+MMAP_BYTES = 256 * 1024 * 1024
+QUERY_BATCH = 900  # Stay below SQLite's bound parameter limit
+
+class HashedIdCache:
+    """Persistent cache of hash_to_point results, shared across PSI runs.
+
+    Entries live in a memory-mapped SQLite file keyed by a digest of the cache
+    version and the ID, so raw IDs are not written to disk. Points are stored
+    uncompressed, so a hit costs no square root. Once the cache holds more than
+    max_entries, the least recently used entries are evicted.
+    """
+
+    def __init__(self, path, max_entries):
+        self.path = path
+        self.max_entries = max_entries
+        self.connection = sqlite3.connect(path, timeout=60)  # Parties on one host may share the file
+        self.connection.execute(f"PRAGMA mmap_size = {MMAP_BYTES}")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS points (key BLOB PRIMARY KEY, point BLOB NOT NULL, last_used REAL NOT NULL)"
+        )
+        self.connection.execute("CREATE INDEX IF NOT EXISTS points_last_used ON points (last_used)")
+        self.connection.commit()
+
+    @staticmethod
+    def key(value: str):
+        return sha256(HASH_CACHE_VERSION + b"|" + value.encode()).digest()[:16]
+
+    def hash_all(self, values):
+        """Return hash_to_point(v) for every value, hashing and storing only the misses.
+
+        Args:
+            values (List[str]): IDs to map onto the curve.
+
+        Returns:
+            Tuple[List[Point], int]: Points in the order of values and the number of cache hits.
+        """
+        keys = [self.key(v) for v in values]
+        cached = {}
+        for i in range(0, len(keys), QUERY_BATCH):
+            batch = keys[i:i + QUERY_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            cached.update(self.connection.execute(
+                f"SELECT key, point FROM points WHERE key IN ({placeholders})", batch
+            ))
+
+        points, misses, hits = [], {}, 0
+        for value, key in zip(values, keys):
+            if key in cached:
+                points.append(bytes_to_point(cached[key]))
+                hits += 1
+            else:
+                point = hash_to_point(value)
+                misses[key] = point_to_bytes(point)
+                points.append(point)
+
+        now = time.time()
+        with self.connection:
+            self.connection.executemany("UPDATE points SET last_used = ? WHERE key = ?", [(now, k) for k in cached])
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO points (key, point, last_used) VALUES (?, ?, ?)",
+                [(k, p, now) for k, p in misses.items()]
+            )
+        self.evict()
+        return points, hits
+
+    def evict(self):
+        """Drop the least recently used entries beyond max_entries."""
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM points").fetchone()
+        if count > self.max_entries:
+            with self.connection:
+                self.connection.execute(
+                    "DELETE FROM points WHERE key IN (SELECT key FROM points ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def close(self):
+        self.connection.close()
@@ -0,0 +1,90 @@
+# modules/psi/incremental_psi.py
+
+import os
+import pickle
+from mpyc.runtime import mpc
+from .distributed_psi import ring_encrypt
+from .ecc import fingerprint, generate_private_key, pack_fingerprints, unpack_fingerprints
+from .party import Party
+
+class PSIState:
+    """What a party keeps between incremental PSI runs.
+
+    The file holds the long-lived private key, so it must stay on the party's
+    own machine with the same protection as the raw data.
+    """
+
+    def __init__(self, n_parties):
+        self.epoch = 0  # Number of completed runs, all parties must agree on it
+        self.n_parties = n_parties
+        self.priv_key = generate_private_key()
+        self.own = {}  # Own ID -> fingerprint under all keys
+        self.others = {i: set() for i in range(n_parties)}  # Party -> fingerprints of its current IDs
+
+    @staticmethod
+    def load(path):
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def save(self, path):
+        # Write to a temporary file first so an interrupted run keeps the old state
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f)
+        os.replace(tmp_path, path)
+
+async def run_incremental_psi(user_ids: list[str], state_path: str, workers: int = 1, cache=None):
+    """Distributed PSI that only encrypts and exchanges the IDs changed since the last run.
+
+    Parties keep their keys and the fully encrypted fingerprints of every set from
+    the previous run. Added IDs go around the ring exactly like in
+    run_distributed_psi, while removed IDs need no curve operations: their owner
+    already knows their fingerprints and broadcasts them for deletion. The first
+    run, or any run where the parties' states disagree, starts from an empty
+    state and therefore exchanges everything once.
+
+    Args:
+        user_ids (List[str]): IDs held by the local party.
+        state_path (str): File where this party keeps its state between runs.
+        workers (int): Worker processes for the local scalar multiplications.
+        cache (HashedIdCache): Optional persistent cache of hashed IDs.
+
+    Returns:
+        List[str]: The local IDs in the intersection, ordered by their
+            fingerprint so that all parties agree on the row order.
+    """
+    n_parties = len(mpc.parties)
+    state = PSIState.load(state_path)
+
+    # Resume only if every party holds the state of the same previous run
+    versions = await mpc.transfer((state.epoch, state.n_parties) if state else None)
+    if state is None or any(v != (state.epoch, n_parties) for v in versions):
+        print(f"[Party {mpc.pid}] 🆕 No shared PSI state to resume from, running a full intersection")
+        state = PSIState(n_parties)
+
+    current_ids = set(user_ids)
+    added = [uid for uid in dict.fromkeys(user_ids) if uid not in state.own]
+    removed = [uid for uid in state.own if uid not in current_ids]
+    print(f"[Party {mpc.pid}] 🧮 PSI delta since run {state.epoch}: +{len(added)} / -{len(removed)} IDs")
+
+    party = Party(mpc.pid, added, workers, cache, priv_key=state.priv_key)
+    finished = [fingerprint(p) for p in await ring_encrypt(party)]
+
+    # Party i broadcasts the added fingerprints of its successor and its own removals
+    removed_fingerprints = [state.own.pop(uid) for uid in removed]
+    messages = await mpc.transfer((pack_fingerprints(finished), pack_fingerprints(removed_fingerprints)))
+    for i, (added_buffer, removed_buffer) in enumerate(messages):
+        state.others[i].difference_update(unpack_fingerprints(removed_buffer))
+        state.others[(i + 1) % n_parties].update(unpack_fingerprints(added_buffer))
+
+    own_added = unpack_fingerprints(messages[(mpc.pid - 1) % n_parties][0])
+    state.own.update(zip(added, own_added))
+
+    others = [state.others[i] for i in range(n_parties) if i != mpc.pid]
+    matched = sorted((fp, uid) for uid, fp in state.own.items() if all(fp in s for s in others))
+
+    state.epoch += 1
+    state.save(state_path)
+    return [uid for _, uid in matched]
@@ -1,64 +1,83 @@
 # modules/psi/multiparty_psi.py
 
+from hashlib import sha256
 from .party import Party
-from .ecc import curve
-from tinyec.ec import Point
+from .ecc import fingerprint, generate_private_key
+
+SHARD_TAG = b"mpc-for-ppml/psi/shard"
 
 def run_3_party_psi(p1: Party, p2: Party, p3: Party):
+    return run_n_party_psi([p1, p2, p3])
+
+def run_n_party_psi(parties: list[Party]):
     # Step 1: Encrypt data by each party (done during init)
-    parties = [p1, p2, p3]
     encrypted_sets = {}
 
-    # Step 2: Re-encrypt others' data
+    # Step 2: Re-encrypt others' data, keeping only fixed-width fingerprints of the results
     for party in parties:
         data = party.get_encrypted_set()
         for other in parties:
             if other != party:
                 data = other.re_encrypt(data)
-        encrypted_sets[party.get_name()] = data
+        encrypted_sets[party.get_name()] = [fingerprint(p) for p in data]
 
-    # Step 3: Compute intersection using stringified points
+    # Step 3: Compute intersection using the fingerprints
     final_sets = list(encrypted_sets.values())
-    intersection = set(map(str, final_sets[0]))
+    intersection = set(final_sets[0])
     for s in final_sets[1:]:
-        intersection &= set(map(str, s))
-
-    # Step 4: Compute the decrypted intersection
-    reverse_map = parties[0].compute_final_encrypted_items(parties)
+        intersection &= set(s)
 
+    # Step 4: Map the intersection back to IDs through the first party's fully
+    # encrypted set, which is still in the order of its dataset
     decrypted = []
-    for pt_key in reverse_map:
-        point_obj = Point(curve, pt_key[0], pt_key[1])
-        if str(point_obj) in intersection:
-            decrypted.append(reverse_map[pt_key])
+    for fp, uid in zip(final_sets[0], parties[0].get_dataset()):
+        if fp in intersection:
+            decrypted.append(uid)
+            intersection.discard(fp)  # Keep the first occurrence of duplicate IDs only
 
     return decrypted
 
-def run_n_party_psi(parties: list[Party]):
-    # Step 1: Encrypt data by each party (done during init)
-    encrypted_sets = {}
+def shard_index(value: str, shards: int):
+    """Public shard of an ID; every party derives the same shard from the ID alone."""
+    return int.from_bytes(sha256(SHARD_TAG + value.encode()).digest()[:8], 'big') % shards
 
-    # Step 2: Re-encrypt others' data
-    for party in parties:
-        data = party.get_encrypted_set()
-        for other in parties:
-            if other != party:
-                data = other.re_encrypt(data)
-        encrypted_sets[party.get_name()] = data
+def partition(dataset: list[str], shards: int):
+    buckets = [[] for _ in range(shards)]
+    for value in dataset:
+        buckets[shard_index(value, shards)].append(value)
+    return buckets
 
-    # Step 3: Compute intersection using stringified points
-    final_sets = list(encrypted_sets.values())
-    intersection = set(map(str, final_sets[0]))
-    for s in final_sets[1:]:
-        intersection &= set(map(str, s))
-    
-    # Step 4: Compute the decrypted intersection
-    reverse_map = parties[0].compute_final_encrypted_items(parties)
+def iter_sharded_psi(datasets: list[list[str]], shards: int, workers: int = 1, cache=None):
+    """Run PSI one shard at a time and yield the intersection as it is found.
 
-    decrypted = []
-    for pt_key in reverse_map:
-        point_obj = Point(curve, pt_key[0], pt_key[1])
-        if str(point_obj) in intersection:
-            decrypted.append(reverse_map[pt_key])
+    IDs are partitioned by a public hash into shards, and equal IDs always land
+    in the same shard, so intersecting shard by shard gives the full
+    intersection. Only one shard's encrypted points and fingerprint sets are
+    alive at a time, so peak memory follows the shard size instead of the
+    population size. Each party keeps one key across all shards.
 
-    return decrypted
+    Args:
+        datasets (List[List[str]]): ID list of every party, in party order.
+        shards (int): Number of shards.
+        workers (int): Worker processes for the scalar multiplications within a shard.
+        cache (HashedIdCache): Optional persistent cache of hashed IDs.
+
+    Yields:
+        str: IDs in the intersection, shard by shard in the first party's order.
+    """
+    keys = [generate_private_key() for _ in datasets]
+    buckets = [partition(dataset, shards) for dataset in datasets]
+    for shard in range(shards):
+        parties = [
+            Party(name, party_buckets[shard], workers, cache, priv_key=key)
+            for name, (party_buckets, key) in enumerate(zip(buckets, keys))
+        ]
+        yield from run_n_party_psi(parties)
+
+        # Release the shard before moving on to the next one
+        del parties
+        for party_buckets in buckets:
+            party_buckets[shard] = None
+
+def run_sharded_psi(datasets: list[list[str]], shards: int, workers: int = 1, cache=None):
+    return list(iter_sharded_psi(datasets, shards, workers, cache))
@@ -0,0 +1,176 @@
+# modules/psi/p256.py
+
+"""Pure-Python secp256r1 arithmetic tuned for PSI.
+
+Points are kept in Jacobian coordinates (X, Y, Z) ~ (X / Z², Y / Z³) during a
+multiplication, so only the final conversion back to affine pays a modular
+inversion. Variable-base multiplication uses width-w NAF with a table of odd
+multiples in affine form (mixed additions); multiples of the generator use a
+precomputed fixed-base table and need no doublings at all.
+
+Affine points are (x, y) tuples and the point at infinity is None.
+"""
+
+P = 0xffffffff00000001000000000000000000000000ffffffffffffffffffffffff
+A = P - 3
+B = 0x5ac635d8aa3a93e7b3ebbd55769886bc651d06b0cc53b0f63bce3c3e27d2604b
+N = 0xffffffff00000000ffffffffffffffffbce6faada7179e84f3b9cac2fc632551
+G = (0x6b17d1f2e12c4247f8bce6e563a440f277037d812deb33a0f4a13945d898c296,
+     0x4fe342e2fe1a7f9b8ee7eb4a7c0f9e162bce33576b315ececbb6406837bf51f5)
+
+WNAF_WIDTH = 5
+FIXED_BASE_WIDTH = 4
+
+_INFINITY = (1, 1, 0)
+_fixed_base_table = None
+
+def lift_x(x):
+    """Return a y with y² = x³ + ax + b, or None if x is not on the curve.
+
+    One modular exponentiation suffices since P ≡ 3 (mod 4).
+    """
+    rhs = (pow(x, 3, P) + A * x + B) % P
+    y = pow(rhs, (P + 1) // 4, P)
+    return y if y * y % P == rhs else None
+
+def _double(point):
+    # dbl-2001-b, using a = -3
+    X1, Y1, Z1 = point
+    if Z1 == 0 or Y1 == 0:
+        return _INFINITY
+    delta = Z1 * Z1 % P
+    gamma = Y1 * Y1 % P
+    beta = X1 * gamma % P
+    alpha = 3 * (X1 - delta) * (X1 + delta) % P
+    X3 = (alpha * alpha - 8 * beta) % P
+    Z3 = ((Y1 + Z1) ** 2 - gamma - delta) % P
+    Y3 = (alpha * (4 * beta - X3) - 8 * gamma * gamma) % P
+    return X3, Y3, Z3
+
+def _add_affine(point, affine):
+    # madd-2007-bl: Jacobian + affine, so the table entries need no Z arithmetic
+    X1, Y1, Z1 = point
+    x2, y2 = affine
+    if Z1 == 0:
+        return x2, y2, 1
+    Z1Z1 = Z1 * Z1 % P
+    U2 = x2 * Z1Z1 % P
+    S2 = y2 * Z1 * Z1Z1 % P
+    H = (U2 - X1) % P
+    r = 2 * (S2 - Y1) % P
+    if H == 0:
+        return _double(point) if r == 0 else _INFINITY
+    HH = H * H % P
+    I = 4 * HH % P
+    J = H * I % P
+    V = X1 * I % P
+    X3 = (r * r - J - 2 * V) % P
+    Y3 = (r * (V - X3) - 2 * Y1 * J) % P
+    Z3 = ((Z1 + H) ** 2 - Z1Z1 - HH) % P
+    return X3, Y3, Z3
+
+def _to_affine(point):
+    X, Y, Z = point
+    if Z == 0:
+        return None
+    z_inv = pow(Z, -1, P)
+    z_inv2 = z_inv * z_inv % P
+    return X * z_inv2 % P, Y * z_inv2 * z_inv % P
+
+def _batch_to_affine(points):
+    """Normalize many Jacobian points with a single inversion (Montgomery's trick)."""
+    prefix = [1]
+    for _, _, Z in points:
+        prefix.append(prefix[-1] * Z % P)
+    inv = pow(prefix[-1], -1, P)
+    affine = [None] * len(points)
+    for i in range(len(points) - 1, -1, -1):
+        X, Y, Z = points[i]
+        z_inv = inv * prefix[i] % P
+        inv = inv * Z % P
+        z_inv2 = z_inv * z_inv % P
+        affine[i] = (X * z_inv2 % P, Y * z_inv2 * z_inv % P)
+    return affine
+
+def _wnaf(k, width):
+    """Width-w NAF digits of k, least significant first; non-zero digits are odd."""
+    digits = []
+    window = 1 << width
+    while k:
+        if k & 1:
+            d = k % window
+            if d >= window >> 1:
+                d -= window
+            k -= d
+        else:
+            d = 0
+        digits.append(d)
+        k >>= 1
+    return digits
+
+def _odd_multiples(affine, width):
+    """[P, 3P, 5P, ..., (2^(w-1) - 1)P] in affine form."""
+    twice = _to_affine(_double((affine[0], affine[1], 1)))
+    multiples = [(affine[0], affine[1], 1)]
+    for _ in range((1 << (width - 2)) - 1):
+        multiples.append(_add_affine(multiples[-1], twice))
+    return _batch_to_affine(multiples)
+
+def scalar_mult(k, affine, width=WNAF_WIDTH):
+    """Compute k · (x, y) with a width-w NAF and mixed Jacobian additions.
+
+    Args:
+        k (int): Scalar, reduced modulo the group order.
+        affine (Tuple[int, int]): Point on secp256r1.
+        width (int): NAF window width; larger windows trade table size for fewer additions.
+
+    Returns:
+        Tuple[int, int] | None: The affine result, or None for the point at infinity.
+    """
+    k %= N
+    if k == 0 or affine is None:
+        return None
+
+    table = _odd_multiples(affine, width)
+    negated = [(x, P - y) for x, y in table]
+    result = _INFINITY
+    for d in reversed(_wnaf(k, width)):
+        result = _double(result)
+        if d > 0:
+            result = _add_affine(result, table[d >> 1])
+        elif d < 0:
+            result = _add_affine(result, negated[-d >> 1])
+    return _to_affine(result)
+
+def _build_fixed_base_table(width=FIXED_BASE_WIDTH):
+    # table[i][j - 1] = j · 2^(w·i) · G, one row per w-bit window of the scalar
+    table = []
+    base = G
+    for _ in range(-(-N.bit_length() // width)):
+        row = [(base[0], base[1], 1)]
+        for _ in range((1 << width) - 2):
+            row.append(_add_affine(row[-1], base))
+        row = _batch_to_affine(row)
+        table.append(row)
+        base = _to_affine(_add_affine((row[-1][0], row[-1][1], 1), base))  # (2^w - 1 + 1) · base
+    return table
+
+def base_mult(k):
+    """Compute k · G from the precomputed fixed-base table (additions only).
+
+    The table (about a thousand points) is built on first use and reused for
+    every later call in the process.
+    """
+    global _fixed_base_table
+    if _fixed_base_table is None:
+        _fixed_base_table = _build_fixed_base_table()
+
+    k %= N
+    mask = (1 << FIXED_BASE_WIDTH) - 1
+    result = _INFINITY
+    for row in _fixed_base_table:
+        d = k & mask
+        if d:
+            result = _add_affine(result, row[d - 1])
+        k >>= FIXED_BASE_WIDTH
+    return _to_affine(result)
@@ -1,16 +1,25 @@
 # modules/psi/party.py
 
-from .ecc import generate_private_key, encrypt_point, hash_to_point
+from .ecc import generate_private_key
+from .workers import encrypt_all, hash_and_encrypt_all, resolve_workers
 
 class Party:
-    def __init__(self, name: str, dataset: list[str]):
+    def __init__(self, name: str, dataset: list[str], workers: int = 1, cache=None, priv_key: int = None):
         self.name = name
         self.dataset = dataset
-        self.priv_key = generate_private_key()
-        self.pub_set = [encrypt_point(hash_to_point(x), self.priv_key) for x in dataset]
+        self.workers = resolve_workers(workers)  # Processes sharing the scalar multiplications
+        self.priv_key = priv_key or generate_private_key()  # Long-lived keys are passed in by incremental PSI
+        self.cache_hits = 0
+
+        if cache is not None:
+            # Reuse hashed points from previous runs, hash only the new IDs
+            points, self.cache_hits = cache.hash_all(dataset)
+            self.pub_set = encrypt_all(points, self.priv_key, self.workers)
+        else:
+            self.pub_set = hash_and_encrypt_all(dataset, self.priv_key, self.workers)
 
     def re_encrypt(self, received_set: list[int]) -> list[int]:
-        return [encrypt_point(point, self.priv_key) for point in received_set]
+        return encrypt_all(received_set, self.priv_key, self.workers)
 
     def get_name(self):
         return self.name
@@ -23,16 +32,4 @@ class Party:
 
     def get_private_key(self):
         return self.priv_key
-    
-    def compute_final_encrypted_items(self, all_parties):
-        """Encrypt own dataset using all private keys, including self."""
-        encrypted = [hash_to_point(x) for x in self.dataset]
-        
-        for party in all_parties:
-            encrypted = [encrypt_point(p, party.get_private_key()) for p in encrypted]
-        
-        point_map = {
-            (p.x, p.y): val
-            for p, val in zip(encrypted, self.dataset)
-        }
-        return point_map
+
@@ -0,0 +1,69 @@
+# modules/psi/workers.py
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from tinyec.ec import Point
+from .ecc import curve, encrypt_point, hash_to_point
+
+CHUNKS_PER_WORKER = 4  # Smaller chunks balance the load, larger ones cut pickling overhead
+
+_pools = {}
+
+def resolve_workers(workers):
+    """Map the CLI value to a worker count: None or 1 runs serially, 0 uses every core."""
+    if workers == 0:
+        return os.cpu_count() or 1
+    return max(1, workers or 1)
+
+def _get_pool(workers):
+    # One pool per worker count, shared by all Party instances of this process
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+def _chunk(items, workers):
+    size = max(1, -(-len(items) // (workers * CHUNKS_PER_WORKER)))
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+# Workers exchange plain (x, y) tuples, which pickle far smaller than tinyec points
+def _hash_and_encrypt_chunk(values, scalar):
+    return [(p.x, p.y) for p in (encrypt_point(hash_to_point(v), scalar) for v in values)]
+
+def _encrypt_chunk(coordinates, scalar):
+    return [(p.x, p.y) for p in (encrypt_point(Point(curve, x, y), scalar) for x, y in coordinates)]
+
+def _run(function, items, scalar, workers):
+    chunks = _chunk(items, workers)
+    results = _get_pool(workers).map(function, chunks, [scalar] * len(chunks))
+    # map() yields in submission order, so the output order is deterministic
+    return [Point(curve, x, y) for chunk in results for x, y in chunk]
+
+def hash_and_encrypt_all(values, scalar, workers=1):
+    """Compute scalar · H(v) for every value, sharded across worker processes.
+
+    Args:
+        values (List[str]): IDs to hash onto the curve.
+        scalar (int): Private key to encrypt with.
+        workers (int): Number of worker processes, 1 runs in the calling process.
+
+    Returns:
+        List[Point]: Encrypted points in the order of values.
+    """
+    if workers <= 1 or len(values) < workers:
+        return [encrypt_point(hash_to_point(v), scalar) for v in values]
+    return _run(_hash_and_encrypt_chunk, values, scalar, workers)
+
+def encrypt_all(points, scalar, workers=1):
+    """Compute scalar · P for every point, sharded across worker processes.
+
+    Args:
+        points (List[Point]): Points to (re-)encrypt.
+        scalar (int): Private key to encrypt with.
+        workers (int): Number of worker processes, 1 runs in the calling process.
+
+    Returns:
+        List[Point]: Encrypted points in the order of points.
+    """
+    if workers <= 1 or len(points) < workers:
+        return [encrypt_point(p, scalar) for p in points]
+    return _run(_encrypt_chunk, [(p.x, p.y) for p in points], scalar, workers)
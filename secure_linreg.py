@@ -6,20 +6,39 @@ from modules.mpc.linear import SecureLinearRegression
 from utils.cli_parser import parse_cli_args
 from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR
 from utils.data_loader import load_party_data
-from utils.data_normalizer import normalize_features
-from utils.visualization import plot_actual_vs_predicted
+from utils.data_normalizer import fit_or_load_normalizer
+from utils.visualization import report_regression_metrics
 
 async def main():
     args = parse_cli_args(type="secure_linreg")
     csv_file = args["csv_file"]
     normalizer_type = args["normalizer_type"]
+    normalizer_stats = args["normalizer_stats"] and args["normalizer_stats"].format(pid=mpc.pid)
+    engine = args["engine"]
+    batch_size = args["batch_size"]
+    log_every = args["log_every"]
+    loss_sample = args["loss_sample"]
+    tol = args["tol"]
+    check_every = args["check_every"]
+
+    # Build the model now so invalid training options fail before any data is exchanged;
+    # epochs and learning rate are set once party 0 has entered them
+    try:
+        model = SecureLinearRegression(
+            engine=engine, batch_size=batch_size,
+            log_every=log_every, loss_sample=loss_sample, tol=tol, check_every=check_every
+        )
+    except ValueError as e:
+        print(f"[Party {mpc.pid}] ❌ Invalid training options: {e}")
+        sys.exit(1)
     
     X_local, y_local = load_party_data(csv_file)
     
     # Normalize features
     if normalizer_type:
         try:
-            X_local = normalize_features(X_local, method=normalizer_type)
+            normalizer = fit_or_load_normalizer(normalizer_type, normalizer_stats, X_local)
+            X_local = normalizer.transform(X_local).tolist()
             print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization.")
         except ValueError as e:
             print(f"[Normalizer] ❌ Normalization error: {e}")
@@ -65,14 +84,12 @@ async def main():
 
     # Run secure regression
     print(f"\n[Party {mpc.pid}] ⚙️ Running linear regression to the data...")
-    model = SecureLinearRegression(epochs=epochs, lr=lr)
+    model.epochs, model.lr = epochs, lr
     await model.fit([X_all], [y_all])
     
-    # Try to predict the train data
-    predictions = await model.predict([X_all][0])
-
-    # Only visualize if you are party 0
-    await plot_actual_vs_predicted(y_all, predictions, mpc)
+    # Evaluate on the train data inside MPC, only the aggregate metrics are revealed
+    metrics = await model.evaluate(X_all, y_all)
+    await report_regression_metrics(metrics, mpc)
 
     await mpc.shutdown()
 
@@ -4,22 +4,46 @@ import sys
 from mpyc.runtime import mpc
 from modules.mpc.logistic import SecureLogisticRegression
 from utils.cli_parser import parse_cli_args
-from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR
+from utils.constant import DEFAULT_EPOCHS, DEFAULT_LR, DEFAULT_NEWTON_ITERATIONS
 from utils.data_loader import load_party_data
-from utils.data_normalizer import normalize_features
-from utils.visualization import plot_logistic_evaluation_report
+from utils.data_normalizer import fit_or_load_normalizer
+from utils.visualization import report_classification_metrics
 
 async def main():
     args = parse_cli_args(type="secure_logreg")
     csv_file = args["csv_file"]
     normalizer_type = args["normalizer_type"]
+    normalizer_stats = args["normalizer_stats"] and args["normalizer_stats"].format(pid=mpc.pid)
+    engine = args["engine"]
+    batch_size = args["batch_size"]
+    log_every = args["log_every"]
+    loss_sample = args["loss_sample"]
+    tol = args["tol"]
+    check_every = args["check_every"]
+    sigmoid = args["sigmoid"]
+    sigmoid_degree = args["sigmoid_degree"]
+    sigmoid_interval = args["sigmoid_interval"]
+    optimizer = args["optimizer"]
+
+    # Build the model now so invalid training options fail before any data is exchanged;
+    # epochs and learning rate are set once party 0 has entered them
+    try:
+        model = SecureLogisticRegression(
+            engine=engine, optimizer=optimizer, batch_size=batch_size,
+            log_every=log_every, loss_sample=loss_sample, tol=tol, check_every=check_every,
+            sigmoid=sigmoid, sigmoid_degree=sigmoid_degree, sigmoid_interval=sigmoid_interval
+        )
+    except ValueError as e:
+        print(f"[Party {mpc.pid}] ❌ Invalid training options: {e}")
+        sys.exit(1)
     
     X_local, y_local = load_party_data(csv_file)
     
     # Normalize features
     if normalizer_type:
         try:
-            X_local = normalize_features(X_local, method=normalizer_type)
+            normalizer = fit_or_load_normalizer(normalizer_type, normalizer_stats, X_local)
+            X_local = normalizer.transform(X_local).tolist()
             print(f"[Normalizer] 🧪 Applied '{normalizer_type}' normalization.")
         except ValueError as e:
             print(f"[Normalizer] ❌ Normalization error: {e}")
@@ -37,14 +61,15 @@ async def main():
     # Flatten
     X_all = sum(X_all_nested, [])
     y_all = sum(y_all_nested, [])
-    
+
     # Get the learning variables (epochs and lr)
+    default_epochs = DEFAULT_EPOCHS if optimizer == "gd" else DEFAULT_NEWTON_ITERATIONS
     if mpc.pid == 0:
         try:
-            epochs_input = input(f"\n[Party 0] ❓ Enter number of epochs (default={DEFAULT_EPOCHS}): \n >>  ").strip()
+            epochs_input = input(f"\n[Party 0] ❓ Enter number of epochs (default={default_epochs}): \n >>  ").strip()
             lr_input = input(f"[Party 0] ❓ Enter learning rate (default={DEFAULT_LR}): \n >>  ").strip()
 
-            epochs = int(epochs_input) if epochs_input else DEFAULT_EPOCHS
+            epochs = int(epochs_input) if epochs_input else default_epochs
             lr = float(lr_input) if lr_input else DEFAULT_LR
 
             print(f"[Party 0] ✅ Using {epochs} epochs and {lr} learning rate.")
@@ -65,14 +90,14 @@ async def main():
 
     # Run secure regression
     print(f"\n[Party {mpc.pid}] ⚙️ Running logistic regression to the data...")
-    model = SecureLogisticRegression(epochs=epochs, lr=lr)
+    model.epochs, model.lr = epochs, lr
     await model.fit([X_all], [y_all])
 
-    # Try to predict the train data
-    predictions = await model.predict([X_all][0])
-    
+    # Evaluate on the train data inside MPC, only the aggregate metrics are revealed
+    metrics = await model.evaluate(X_all, y_all)
+
     # Evaluation report, only visualize if you are party 0
-    await plot_logistic_evaluation_report(y_all, predictions, mpc)
+    await report_classification_metrics(metrics, mpc)
 
     await mpc.shutdown()
 
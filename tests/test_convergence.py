@@ -0,0 +1,31 @@
+# tests/test_convergence.py
+
+import numpy as np
+import pytest
+from mpyc.runtime import mpc
+from modules.mpc.convergence import EarlyStopping
+
+secfx = mpc.SecFxp()
+
+def converged(tol, gradient):
+    async def check():
+        await mpc.start()
+        result = await EarlyStopping(tol).converged(secfx.array(np.array(gradient)))
+        await mpc.shutdown()
+        return result
+    return mpc.run(check())
+
+@pytest.mark.parametrize("tol, gradient", [
+    (1e-3, [0.3]),
+    (1e-2, [3.0, 50.0]),
+    (1e-3, [200.0, -30000.0]),
+])
+def test_large_gradient_with_small_tol_is_not_converged(tol, gradient):
+    assert not converged(tol, gradient)
+
+@pytest.mark.parametrize("tol, gradient", [
+    (1e-2, [0.001, 0.002]),
+    (1e-3, [0.0005]),
+])
+def test_small_gradient_is_converged(tol, gradient):
+    assert converged(tol, gradient)
@@ -1,20 +1,57 @@
 # utils/cli_parser.py
 
 import sys
+from utils.constant import (
+    DEFAULT_ENGINE, DEFAULT_OPTIMIZER, DEFAULT_LOG_EVERY, DEFAULT_CHECK_EVERY,
+    DEFAULT_SIGMOID, DEFAULT_SIGMOID_DEGREE, DEFAULT_SIGMOID_INTERVAL, DEFAULT_PSI_MODE,
+    DEFAULT_PSI_WORKERS, DEFAULT_PSI_CACHE_SIZE, DEFAULT_PSI_STATE,
+    DEFAULT_PSI_SHARDS, DEFAULT_NORMALIZER_SCOPE
+)
 
 def print_usage_and_exit(script_type):
     is_main = script_type == "main"
+    is_logistic = script_type in ("main", "secure_logreg")
     print(f"Usage: python {script_type}.py [MPyC options] <dataset.csv>", end=" ")
     if is_main:
-        print("[--regression-type|--r] [linear|logistic]", end=" ")
-    print("[--normalizer|--n] [minmax|zscore] [--help|-h]")
+        print("[--regression-type|--r] [linear|logistic] [--psi-mode] [distributed|incremental|central] [--psi-workers] <k>", end=" ")
+        print("[--psi-cache] <file> [--psi-cache-size] <entries> [--psi-state] <file> [--psi-shards] <k>", end=" ")
+        print("[--psi-estimate] <rows> [--psi-min-overlap] <users> [--chunk-rows] <rows> [--normalizer-scope] [joint|local]", end=" ")
+    print("[--normalizer|--n] [minmax|zscore] [--normalizer-stats] <file> [--engine|-e] [array|gram|scalar]", end=" ")
+    if is_logistic:
+        print("[--optimizer|-o] [gd|newton|fixed-hessian]", end=" ")
+        print("[--sigmoid] [taylor5|taylor3|piecewise|chebyshev] [--sigmoid-degree] <d> [--sigmoid-interval] <r>", end=" ")
+    print("[--batch-size|-b] <rows> [--log-every] <k> [--loss-sample] <rows>", end=" ")
+    print("[--tol] <tolerance> [--check-every] <k> [--help|-h]")
 
     print("\nArguments:")
     print("  [MPyC options]     : Optional, like -M (number of parties) or -I (party id)")
-    print("  <dataset.csv>      : Path to the local party's CSV file")
+    print("  <dataset.csv>      : Path to the local party's CSV file", end="")
+    print(" (or a .ppml file from convert_to_binary.py)" if is_main else "")
     print("  --normalizer -n    : Choose normalization method: 'minmax' or 'zscore', default to none")
+    print("  --normalizer-stats : Reuse the normalization statistics saved in this file, or save them there if it does not exist ('{pid}' is replaced by the party id)")
     if is_main:
         print("  --regression -r    : Choose regression method: 'linear' or 'logistic', default to 'linear'")
+        print(f"  --psi-mode         : Choose PSI mode: 'distributed' (IDs never leave their owner), 'incremental' or 'central', default to '{DEFAULT_PSI_MODE}'")
+        print(f"  --psi-workers      : Worker processes for the PSI curve multiplications (0 uses every core), default to {DEFAULT_PSI_WORKERS}")
+        print("  --psi-cache        : File caching hashed IDs across runs (build it ahead with build_psi_cache.py), default to none")
+        print(f"  --psi-cache-size   : Maximum entries kept in the hashed-ID cache, default to {DEFAULT_PSI_CACHE_SIZE}")
+        print(f"  --psi-state        : State file kept between 'incremental' PSI runs (holds the private key), default to '{DEFAULT_PSI_STATE}'")
+        print(f"  --psi-shards       : Hash buckets the 'central' PSI processes one at a time to bound memory, default to {DEFAULT_PSI_SHARDS}")
+        print("  --psi-estimate     : Estimate the overlap first from a blinded sample of about this many IDs, default to off")
+        print("  --psi-min-overlap  : Skip the full PSI and training when the estimated overlap is below this many users (requires --psi-estimate)")
+        print("  --chunk-rows       : Stream the CSV file in chunks of this many rows instead of loading it whole, default to off")
+        print(f"  --normalizer-scope : Fit the normalizer on the intersected rows after PSI ('joint') or on the whole local file ('local'), default to '{DEFAULT_NORMALIZER_SCOPE}'")
+    print("  --engine -e        : Choose training engine: 'array', 'gram' (linear only) or 'scalar', default to 'array'")
+    if is_logistic:
+        print("  --optimizer -o     : Choose logistic optimizer: 'gd', 'newton' or 'fixed-hessian', default to 'gd'")
+        print(f"  --sigmoid          : Choose sigmoid approximation: 'taylor5', 'taylor3', 'piecewise' or 'chebyshev', default to '{DEFAULT_SIGMOID}'")
+        print(f"  --sigmoid-degree   : Odd polynomial degree for the 'chebyshev' sigmoid, default to {DEFAULT_SIGMOID_DEGREE}")
+        print(f"  --sigmoid-interval : Fitting interval [-r, r] for the 'chebyshev' sigmoid, default to {DEFAULT_SIGMOID_INTERVAL:g}")
+    print("  --batch-size -b    : Rows per mini-batch for gradient descent, default to full batch")
+    print(f"  --log-every        : Reveal theta every k epochs during training (0 disables it), default to {DEFAULT_LOG_EVERY}")
+    print("  --loss-sample      : Log the training loss estimated on this many random rows (all rows if larger), default to no loss")
+    print("  --tol              : Stop early once the secure gradient norm drops below this tolerance")
+    print(f"  --check-every      : Epochs between early-stopping checks, default to {DEFAULT_CHECK_EVERY}")
     print("  --help -h          : Show this help message and exit")
 
     print("\nExample:")
@@ -27,6 +64,28 @@ def print_usage_and_exit(script_type):
     print()
     sys.exit(1)
 
+def get_arg_value(long_flag, short_flag=None, default=None):
+    """Returns the value following --long_flag or -short_flag, or default if absent."""
+    for flag in (long_flag, short_flag):
+        if flag in sys.argv:
+            idx = sys.argv.index(flag)
+            if idx + 1 < len(sys.argv):
+                return sys.argv[idx + 1]
+            return default
+    return default
+
+def get_typed_arg_value(script_type, cast, long_flag, short_flag=None, default=None):
+    """Like get_arg_value, but converts the value with cast and exits on invalid input."""
+    value = get_arg_value(long_flag, short_flag)
+    if value is None:
+        return default
+
+    try:
+        return cast(value)
+    except ValueError:
+        print(f"❌ Invalid value for {long_flag}: {value}\n")
+        print_usage_and_exit(script_type)
+
 def parse_cli_args(type):
     if '--help' in sys.argv or '-h' in sys.argv:
         print_usage_and_exit(type)
@@ -47,28 +106,54 @@ def parse_cli_args(type):
         print("❌ CSV file not provided.\n")
         print_usage_and_exit()
 
-    # Parse normalizer
-    if '--normalizer' in sys.argv:
-        idx = sys.argv.index('--normalizer')
-        if idx + 1 < len(sys.argv):
-            normalizer_type = sys.argv[idx + 1]
-    elif '-n' in sys.argv:
-        idx = sys.argv.index('-n')
-        if idx + 1 < len(sys.argv):
-            normalizer_type = sys.argv[idx + 1]
-
-    # Parse regression type
-    if '--regression-type' in sys.argv:
-        idx = sys.argv.index('--regression-type')
-        if idx + 1 < len(sys.argv):
-            regression_type = sys.argv[idx + 1]
-    elif '-r' in sys.argv:
-        idx = sys.argv.index('-r')
-        if idx + 1 < len(sys.argv):
-            regression_type = sys.argv[idx + 1]
+    # Parse optional flags
+    normalizer_type = get_arg_value('--normalizer', '-n')
+    normalizer_stats = get_arg_value('--normalizer-stats')
+    normalizer_scope = get_arg_value('--normalizer-scope', default=DEFAULT_NORMALIZER_SCOPE)
+    regression_type = get_arg_value('--regression-type', '-r', regression_type)
+    psi_mode = get_arg_value('--psi-mode', default=DEFAULT_PSI_MODE)
+    psi_workers = get_typed_arg_value(type, int, '--psi-workers', default=DEFAULT_PSI_WORKERS)
+    psi_cache = get_arg_value('--psi-cache')
+    psi_cache_size = get_typed_arg_value(type, int, '--psi-cache-size', default=DEFAULT_PSI_CACHE_SIZE)
+    psi_state = get_arg_value('--psi-state', default=DEFAULT_PSI_STATE)
+    psi_shards = get_typed_arg_value(type, int, '--psi-shards', default=DEFAULT_PSI_SHARDS)
+    psi_estimate = get_typed_arg_value(type, int, '--psi-estimate')
+    psi_min_overlap = get_typed_arg_value(type, int, '--psi-min-overlap')
+    chunk_rows = get_typed_arg_value(type, int, '--chunk-rows')
+    engine = get_arg_value('--engine', '-e', DEFAULT_ENGINE)
+    optimizer = get_arg_value('--optimizer', '-o', DEFAULT_OPTIMIZER)
+    batch_size = get_typed_arg_value(type, int, '--batch-size', '-b')
+    log_every = get_typed_arg_value(type, int, '--log-every', default=DEFAULT_LOG_EVERY)
+    loss_sample = get_typed_arg_value(type, int, '--loss-sample')
+    tol = get_typed_arg_value(type, float, '--tol')
+    check_every = get_typed_arg_value(type, int, '--check-every', default=DEFAULT_CHECK_EVERY)
+    sigmoid = get_arg_value('--sigmoid', default=DEFAULT_SIGMOID)
+    sigmoid_degree = get_typed_arg_value(type, int, '--sigmoid-degree', default=DEFAULT_SIGMOID_DEGREE)
+    sigmoid_interval = get_typed_arg_value(type, float, '--sigmoid-interval', default=DEFAULT_SIGMOID_INTERVAL)
 
     return {
         "csv_file": csv_file,
         "normalizer_type": normalizer_type,
-        "regression_type": regression_type
+        "normalizer_stats": normalizer_stats,
+        "normalizer_scope": normalizer_scope,
+        "regression_type": regression_type,
+        "psi_mode": psi_mode,
+        "psi_workers": psi_workers,
+        "psi_cache": psi_cache,
+        "psi_cache_size": psi_cache_size,
+        "psi_state": psi_state,
+        "psi_shards": psi_shards,
+        "psi_estimate": psi_estimate,
+        "psi_min_overlap": psi_min_overlap,
+        "chunk_rows": chunk_rows,
+        "engine": engine,
+        "optimizer": optimizer,
+        "batch_size": batch_size,
+        "log_every": log_every,
+        "loss_sample": loss_sample,
+        "tol": tol,
+        "check_every": check_every,
+        "sigmoid": sigmoid,
+        "sigmoid_degree": sigmoid_degree,
+        "sigmoid_interval": sigmoid_interval
     }
@@ -3,3 +3,40 @@
 # Default values for regressor
 DEFAULT_EPOCHS = 200
 DEFAULT_LR = 0.01
+
+# Training engine: 'array' (secure NumPy-style arrays) or 'scalar' (per-element loops)
+DEFAULT_ENGINE = "array"
+
+# Optimizer for logistic regression: 'gd', 'newton' (IRLS) or 'fixed-hessian'
+DEFAULT_OPTIMIZER = "gd"
+DEFAULT_NEWTON_ITERATIONS = 10
+DEFAULT_RIDGE = 1e-2
+
+# Training telemetry: reveal theta every k epochs (0 disables it)
+DEFAULT_LOG_EVERY = 10
+
+# Early stopping: test the gradient norm every k epochs once a tolerance is set
+DEFAULT_CHECK_EVERY = 10
+
+# Sigmoid approximation for logistic regression (see modules/mpc/sigmoid.py)
+DEFAULT_SIGMOID = "taylor5"
+DEFAULT_SIGMOID_DEGREE = 5
+DEFAULT_SIGMOID_INTERVAL = 8.0
+
+# Normalization: 'joint' fits on the intersected rows after PSI, 'local' on the whole local file
+DEFAULT_NORMALIZER_SCOPE = "joint"
+
+# Evaluation: equal-width score bins for the securely computed ROC curve
+DEFAULT_ROC_BINS = 10
+
+# PSI: 'distributed' (per-party keys, ring re-encryption), 'incremental' (distributed, only changed IDs
+# are exchanged) or 'central' (every process simulates all parties)
+DEFAULT_PSI_MODE = "distributed"
+DEFAULT_PSI_WORKERS = 1  # Worker processes for the elliptic-curve multiplications, 0 uses every core
+DEFAULT_EC_BACKEND = "native"  # 'native' (Jacobian + wNAF, modules/psi/p256.py) or 'tinyec'
+DEFAULT_PSI_CACHE_SIZE = 10_000_000  # Entries kept in the on-disk hashed-ID cache before LRU eviction
+DEFAULT_PSI_STATE = "psi_state_party{pid}.pkl"  # Per-party state file of incremental PSI
+DEFAULT_PSI_SHARDS = 1  # Hash buckets processed one at a time by the 'central' PSI to bound memory
+
+# Streaming ingestion: rows per chunk when reading party files out of core
+DEFAULT_CHUNK_ROWS = 100_000
@@ -1,6 +1,20 @@
 # utils/data_loader.py
 
 import csv
+import json
+import os
+from itertools import islice
+import numpy as np
+from utils.constant import DEFAULT_CHUNK_ROWS
+from utils.data_normalizer import RunningStats
+
+LABEL_CANDIDATES = ["will_purchase", "purchase_amount"]
+
+# Binary party format: magic, header length, JSON header, then 64-byte aligned
+# blocks of float64 feature columns, the float64 label and fixed-width IDs
+BINARY_EXTENSION = ".ppml"
+BINARY_MAGIC = b"PPMLCOL1"
+BINARY_ALIGNMENT = 64
 
 def load_party_data(filename):
     """Loads a party's data from a CSV file into X and y."""
@@ -14,45 +28,226 @@ def load_party_data(filename):
             y_local.append(label)
     return X_local, y_local
 
-def load_party_data_adapted(filename):
+def detect_columns(header):
+    """Returns the index of the user_id column, of the label column (None if absent) and of the features."""
+    user_id_idx = header.index("user_id")
+    label_idx = None
+    for col in LABEL_CANDIDATES:
+        if col in header:
+            label_idx = header.index(col)
+            break
+
+    feature_idxs = [i for i in range(len(header)) if i != user_id_idx and i != label_idx]
+    return user_id_idx, label_idx, feature_idxs
+
+def load_user_ids(filename):
+    """Loads only the user_id column of a party's CSV file."""
+    with open(filename, 'r') as f:
+        reader = csv.reader(f)
+        user_id_idx = next(reader).index("user_id")
+        return [row[user_id_idx] for row in reader]
+
+def load_party_columns(filename):
     """
-    Dynamically loads CSV data for a party and returns:
-    - user_ids: list of user_id values
-    - X_local: list of feature vectors
-    - y_local: list of labels (if available, else None)
+    Loads a party's CSV or binary file into NumPy columns and returns:
+    - user_ids: array of user_id strings
+    - X_local: float64 matrix of shape (n_rows, n_features), column-major so every feature is contiguous
+    - y_local: float64 label array (if available, else None)
     - feature_names: names of features (excluding user_id and label)
     - label_name: the name of the label column (if available, else None)
     """
-    user_ids = []
-    X_local = []
-    y_local = []
-    feature_names = []
-    label_name = None
+    if filename.endswith(BINARY_EXTENSION):
+        return load_party_binary(filename)
+
+    # csv.reader handles quoted fields, which np.loadtxt would split on embedded commas
+    schema = read_party_schema(filename)
+    label_idx, feature_idxs = schema[1], schema[2]
+
+    id_chunks, X_chunks, y_chunks = [], [], []
+    for ids_chunk, X_chunk, y_chunk in iter_party_chunks(filename, DEFAULT_CHUNK_ROWS, schema):
+        id_chunks.append(np.asarray(ids_chunk, dtype=str))
+        X_chunks.append(X_chunk)
+        y_chunks.append(y_chunk)
+
+    user_ids = np.concatenate(id_chunks) if id_chunks else np.empty(0, dtype=str)
+    X_local = np.asfortranarray(np.concatenate(X_chunks) if X_chunks else np.empty((0, len(feature_idxs))))
+    y_local = None
+    if label_idx is not None:
+        y_local = np.concatenate(y_chunks) if y_chunks else np.empty(0)
+    return user_ids, X_local, y_local, schema[3], schema[4]
+
+def _aligned(offset):
+    return -(-offset // BINARY_ALIGNMENT) * BINARY_ALIGNMENT
+
+def write_party_binary(filename, user_ids, X_local, y_local, feature_names, label_name):
+    """Writes party data in the binary format read by load_party_binary."""
+    ids = np.asarray(user_ids, dtype=str).astype(np.bytes_)
+    X_local = np.asarray(X_local, dtype=np.float64).reshape(len(ids), len(feature_names))
+    n_rows, n_features = X_local.shape
+
+    header = {
+        "rows": n_rows,
+        "feature_names": list(feature_names),
+        "label_name": label_name,
+        "id_width": max(ids.dtype.itemsize, 1)
+    }
+    # Offsets depend on the header length, so place the blocks after a first sizing pass
+    offset = _aligned(len(BINARY_MAGIC) + 4 + len(json.dumps(header)) + 256)
+    header["features_offset"] = offset
+    offset = _aligned(offset + 8 * n_rows * n_features)
+    header["label_offset"] = offset if y_local is not None else None
+    offset = _aligned(offset + 8 * n_rows) if y_local is not None else offset
+    header["ids_offset"] = offset
+    encoded = json.dumps(header).encode()
+
+    with open(filename, 'wb') as f:
+        f.write(BINARY_MAGIC + len(encoded).to_bytes(4, 'little') + encoded)
+        f.seek(header["features_offset"])
+        f.write(np.ascontiguousarray(X_local.T).tobytes())  # One contiguous block per feature
+        if y_local is not None:
+            f.seek(header["label_offset"])
+            f.write(np.asarray(y_local, dtype=np.float64).tobytes())
+        f.seek(header["ids_offset"])
+        f.write(ids.astype(f"S{header['id_width']}").tobytes())
+
+def _map(filename, dtype, offset, shape):
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode='r', offset=offset, shape=shape)
+
+def load_party_binary(filename):
+    """
+    Opens a binary party file without parsing: feature and label columns are
+    read-only memory maps, only the IDs are decoded into strings.
+    Returns the same values as load_party_columns.
+    """
+    with open(filename, 'rb') as f:
+        if f.read(len(BINARY_MAGIC)) != BINARY_MAGIC:
+            raise ValueError(f"{filename} is not a binary party file")
+        header = json.loads(f.read(int.from_bytes(f.read(4), 'little')))
+
+    n_rows, n_features = header["rows"], len(header["feature_names"])
+    X_local = _map(filename, np.float64, header["features_offset"], (n_features, n_rows)).T
+    y_local = None
+    if header["label_offset"] is not None:
+        y_local = _map(filename, np.float64, header["label_offset"], (n_rows,))
+    ids = _map(filename, f"S{header['id_width']}", header["ids_offset"], (n_rows,))
+    user_ids = ids.astype(str)  # IDs are ASCII, the bytes_ cast in write_party_binary enforces it
+    return user_ids, X_local, y_local, header["feature_names"], header["label_name"]
+
+def convert_csv_to_binary(csv_filename, binary_filename=None):
+    """One-time conversion of a party CSV file into the binary format. Returns the output path."""
+    binary_filename = binary_filename or os.path.splitext(csv_filename)[0] + BINARY_EXTENSION
+    write_party_binary(binary_filename, *load_party_columns(csv_filename))
+    return binary_filename
+
+def _is_numeric(values):
+    try:
+        np.asarray([v for v in values if v != ""], dtype=np.float64)
+        return True
+    except ValueError:
+        return False
 
+def read_party_schema(filename, sample_rows=1000):
+    """
+    Detects the user_id, label and feature columns from the header, and infers
+    column types from the first sample_rows rows: feature columns that do not
+    parse as numbers are left out, a non-numeric label is an error. Every loader
+    goes through this function, so they keep the same columns whatever the chunk
+    size; later values of a kept column that do not parse fail in _parse_column.
+
+    Returns the user_id index, the label index (or None), the feature indices,
+    the feature names and the label name (or None).
+    """
     with open(filename, 'r') as f:
         reader = csv.reader(f)
         header = next(reader)
+        sample = list(islice(reader, sample_rows))
 
-        user_id_idx = header.index("user_id")
-        label_col_candidates = ["will_purchase", "purchase_amount"]
-        label_idx = None
-        for col in label_col_candidates:
-            if col in header:
-                label_idx = header.index(col)
-                label_name = col
-                break
-            
-        if label_idx is not None:
-            label_name = header[label_idx]
-
-        feature_idxs = [i for i in range(len(header)) if i != user_id_idx and i != label_idx]
-        feature_names = [header[i] for i in feature_idxs]
+    user_id_idx, label_idx, feature_idxs = detect_columns(header)
+    if label_idx is not None and not _is_numeric(row[label_idx] for row in sample):
+        raise ValueError(f"{filename}: label column '{header[label_idx]}' is not numeric")
 
-        for row in reader:
-            user_ids.append(row[user_id_idx])
-            X_local.append([float(row[i]) for i in feature_idxs])
+    numeric_idxs = [i for i in feature_idxs if _is_numeric(row[i] for row in sample)]
+    for i in sorted(set(feature_idxs) - set(numeric_idxs)):
+        print(f"[Loader] ⚠️ Skipping non-numeric column '{header[i]}'")
+
+    label_name = header[label_idx] if label_idx is not None else None
+    return user_id_idx, label_idx, numeric_idxs, [header[i] for i in numeric_idxs], label_name
+
+def _parse_column(values, filename, column, first_line):
+    """Converts one column of a chunk to float64, naming the offending value on failure."""
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except ValueError:
+        for line, value in enumerate(values, start=first_line):
+            try:
+                float(value)
+            except ValueError:
+                raise ValueError(f"{filename}, line {line}: column '{column}' has non-numeric value {value!r}") from None
+        raise
+
+def iter_party_chunks(filename, chunk_rows=DEFAULT_CHUNK_ROWS, schema=None):
+    """
+    Yields a party's CSV file in chunks of at most chunk_rows rows, so files
+    larger than memory can be processed. Each chunk is a tuple of:
+    - user_ids: list of user_id values
+    - X_chunk: float64 matrix of shape (rows, n_features)
+    - y_chunk: float64 label array (if available, else None)
+    """
+    user_id_idx, label_idx, feature_idxs, feature_names, label_name = schema or read_party_schema(filename)
+
+    with open(filename, 'r') as f:
+        reader = csv.reader(f)
+        next(reader)  # Skip header
+        first_line = 2
+        while True:
+            rows = list(islice(reader, chunk_rows))
+            if not rows:
+                return
+
+            user_ids = [row[user_id_idx] for row in rows]
+            X_chunk = np.empty((len(rows), len(feature_idxs)))
+            for j, (i, name) in enumerate(zip(feature_idxs, feature_names)):
+                X_chunk[:, j] = _parse_column([row[i] for row in rows], filename, name, first_line)
+            y_chunk = None
             if label_idx is not None:
-                y_local.append(float(row[label_idx]))
+                y_chunk = _parse_column([row[label_idx] for row in rows], filename, label_name, first_line)
+            first_line += len(rows)
+            yield user_ids, X_chunk, y_chunk
 
-    return user_ids, X_local, y_local if y_local else None, feature_names, label_name
+def scan_party_file(filename, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    First streaming pass: collects the user IDs for PSI and the per-feature
+    normalization statistics, without keeping any feature rows in memory.
+
+    Returns the user_ids, a RunningStats, the feature names and the label name.
+    """
+    schema = read_party_schema(filename)
+    feature_names, label_name = schema[3], schema[4]
+    stats = RunningStats(len(feature_names))
+    user_ids = []
+    for ids_chunk, X_chunk, _ in iter_party_chunks(filename, chunk_rows, schema):
+        user_ids.extend(ids_chunk)
+        stats.update(X_chunk)
+    return user_ids, stats, feature_names, label_name
+
+def filter_party_file(filename, wanted_ids, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """
+    Second streaming pass: keeps only the rows whose user_id is in wanted_ids.
+
+    Returns the features (float64 matrix) and labels (array, or None) in the
+    order of wanted_ids.
+    """
+    schema = read_party_schema(filename)
+    position = {uid: i for i, uid in enumerate(wanted_ids)}
+    X_filtered = np.zeros((len(wanted_ids), len(schema[2])))
+    y_filtered = np.zeros(len(wanted_ids)) if schema[1] is not None else None
 
+    for ids_chunk, X_chunk, y_chunk in iter_party_chunks(filename, chunk_rows, schema):
+        rows = np.asarray([position.get(uid, -1) for uid in ids_chunk], dtype=np.int64)
+        keep = rows >= 0
+        X_filtered[rows[keep]] = X_chunk[keep]
+        if y_filtered is not None:
+            y_filtered[rows[keep]] = y_chunk[keep]
+    return X_filtered, y_filtered
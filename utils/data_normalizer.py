@@ -1,50 +1,122 @@
 # utils/data_normalizer.py
 
-import sys
-
-def minmax_normalize(X):
-    if not X:
-        return X
-
-    num_features = len(X[0])
-    for j in range(num_features):
-        feature_column = [row[j] for row in X]
-        min_val = min(feature_column)
-        max_val = max(feature_column)
-        range_val = max_val - min_val if max_val != min_val else 1.0
-
-        for i in range(len(X)):
-            X[i][j] = (X[i][j] - min_val) / range_val
-    
-    return X
-
-def zscore_normalize(X):
-    if not X:
-        return X
-
-    num_features = len(X[0])
-    for j in range(num_features):
-        feature_column = [row[j] for row in X]
-        mean_val = sum(feature_column) / len(feature_column)
-        std_val = (sum((x - mean_val) ** 2 for x in feature_column) / len(feature_column)) ** 0.5
-        std_val = std_val if std_val != 0 else 1.0
-
-        for i in range(len(X)):
-            X[i][j] = (X[i][j] - mean_val) / std_val
-    
-    return X
-
-def normalize_features(data, method='zscore'):
-    normalizers = {
-        'minmax': minmax_normalize,
-        'zscore': zscore_normalize
-    }
-
-    if method not in normalizers:
-        raise ValueError(f"Unsupported normalization method: {method}")
-
-    try:
-        return normalizers[method](data)
-    except ValueError as e:
-        print(f"[Normalizer] ❌ Normalization error: {e}")
-        sys.exit(1)
+import json
+import os
+import numpy as np
+
+NORMALIZERS = ("minmax", "zscore")
+
+class RunningStats:
+    """Per-feature count, mean, variance, min and max, merged chunk by chunk.
+
+    Chunks are combined with the parallel variance formula of Chan et al., so the
+    result matches a single pass over all rows without keeping them in memory.
+    """
+
+    def __init__(self, n_features):
+        self.count = 0
+        self.mean = np.zeros(n_features)
+        self.m2 = np.zeros(n_features)  # Sum of squared deviations from the mean
+        self.min = np.full(n_features, np.inf)
+        self.max = np.full(n_features, -np.inf)
+
+    def update(self, X_chunk):
+        X_chunk = np.asarray(X_chunk, dtype=np.float64)
+        n = X_chunk.shape[0]
+        if n == 0:
+            return
+
+        chunk_mean = X_chunk.mean(axis=0)
+        chunk_m2 = ((X_chunk - chunk_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = chunk_mean - self.mean
+        self.mean = self.mean + delta * (n / total)
+        self.m2 = self.m2 + chunk_m2 + delta ** 2 * (self.count * n / total)
+        self.count = total
+        self.min = np.minimum(self.min, X_chunk.min(axis=0))
+        self.max = np.maximum(self.max, X_chunk.max(axis=0))
+
+    @property
+    def std(self):
+        return np.sqrt(self.m2 / self.count) if self.count else np.zeros_like(self.m2)
+
+class Normalizer:
+    """Column normalizer whose fitted statistics can be saved and re-applied.
+
+    fit() gathers every column statistic in one vectorized pass (streamed files
+    pass their RunningStats instead), and transform() applies them without
+    modifying its input, so scoring jobs reuse exactly the training statistics.
+    """
+
+    def __init__(self, method='zscore', stats=None):
+        if method not in NORMALIZERS:
+            raise ValueError(f"Unsupported normalization method: {method}")
+        self.method = method
+        self.stats = stats  # RunningStats, None until fitted
+
+    def fit(self, X):
+        X = np.asarray(X, dtype=np.float64)
+        self.stats = RunningStats(X.shape[1] if X.ndim == 2 else 0)
+        self.stats.update(X)
+        return self
+
+    def transform(self, X):
+        if self.stats is None:
+            raise ValueError("Normalizer not fitted. Call fit() or load() first.")
+
+        X = np.asarray(X, dtype=np.float64)
+        if self.method == 'zscore':
+            std = self.stats.std
+            return (X - self.stats.mean) / np.where(std != 0, std, 1.0)
+        range_val = self.stats.max - self.stats.min
+        return (X - self.stats.min) / np.where(range_val != 0, range_val, 1.0)
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+    def save(self, path):
+        stats = self.stats
+        with open(path, 'w') as f:
+            json.dump({
+                "method": self.method,
+                "count": stats.count,
+                "mean": stats.mean.tolist(),
+                "m2": stats.m2.tolist(),
+                "min": stats.min.tolist(),
+                "max": stats.max.tolist()
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r') as f:
+            saved = json.load(f)
+        stats = RunningStats(len(saved["mean"]))
+        stats.count = saved["count"]
+        stats.mean, stats.m2 = np.array(saved["mean"]), np.array(saved["m2"])
+        stats.min, stats.max = np.array(saved["min"]), np.array(saved["max"])
+        return cls(saved["method"], stats)
+
+def fit_or_load_normalizer(method, stats_path=None, X=None, stats=None):
+    """Reuse the statistics saved at stats_path if it exists, otherwise fit them and save them there.
+
+    Args:
+        method (str): 'minmax' or 'zscore'.
+        stats_path (str): Optional JSON file with saved statistics.
+        X: Data to fit on when nothing is saved yet.
+        stats (RunningStats): Statistics gathered beforehand (e.g. while streaming), used instead of X.
+
+    Returns:
+        Normalizer: The fitted normalizer.
+    """
+    if stats_path and os.path.exists(stats_path):
+        normalizer = Normalizer.load(stats_path)
+        if normalizer.method != method:
+            raise ValueError(f"{stats_path} holds '{normalizer.method}' statistics, not '{method}'")
+        print(f"[Normalizer] 📂 Reusing '{method}' statistics from {stats_path}.")
+        return normalizer
+
+    normalizer = Normalizer(method, stats) if stats is not None else Normalizer(method).fit(X)
+    if stats_path:
+        normalizer.save(stats_path)
+        print(f"[Normalizer] 💾 Saved '{method}' statistics to {stats_path}.")
+    return normalizer